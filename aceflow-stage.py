@@ -9,24 +9,97 @@ AI Agent 工作流阶段控制工具
 import os
 import sys
 import json
-import argparse
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Optional, Dict, List, Any
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Optional, Dict, List, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选加速依赖，缺失时回退到标准库 json
+    orjson = None
 
 # 脚本信息
 SCRIPT_NAME = "aceflow-stage.py"
 VERSION = "3.0.0"
 
+# 各模式的阶段顺序
+STAGE_ORDERS = {
+    "minimal": ("analysis", "planning", "implementation", "validation"),
+    "standard": ("user_stories", "tasks_planning", "test_design",
+                 "implementation", "testing", "review"),
+    "complete": ("s1_user_story", "s2_tasks_group", "s3_testcases",
+                 "s4_implementation", "s5_test_report", "s6_codereview",
+                 "s7_demo_script", "s8_summary_report"),
+    "smart": ("analysis", "planning", "implementation", "validation")
+}
+
+# 阶段显示名称
+STAGE_DISPLAY_NAMES = {
+    # Minimal/Smart 模式
+    "analysis": "需求分析",
+    "planning": "规划设计",
+    "implementation": "功能实现",
+    "validation": "验证测试",
+
+    # Standard 模式
+    "user_stories": "用户故事",
+    "tasks_planning": "任务规划",
+    "test_design": "测试设计",
+    "testing": "测试执行",
+    "review": "代码评审",
+
+    # Complete 模式
+    "s1_user_story": "S1-用户故事分析",
+    "s2_tasks_group": "S2-任务分组规划",
+    "s3_testcases": "S3-测试用例设计",
+    "s4_implementation": "S4-功能实现",
+    "s5_test_report": "S5-测试报告",
+    "s6_codereview": "S6-代码评审",
+    "s7_demo_script": "S7-演示脚本",
+    "s8_summary_report": "S8-项目总结"
+}
+
+@lru_cache(maxsize=None)
+def _stage_index(mode: str) -> Dict[str, int]:
+    """获取阶段名称到顺序下标的映射 (按模式缓存)"""
+    return {stage: i for i, stage in enumerate(STAGE_ORDERS.get(mode, ()))}
+
+# 输出重定向到文件或管道时不使用色彩
+_USE_COLOR = sys.stdout is not None and sys.stdout.isatty()
+
 # 颜色定义 (ANSI色彩代码)
 class Colors:
-    RED = '\033[0;31m'
-    GREEN = '\033[0;32m'
-    YELLOW = '\033[1;33m'
-    BLUE = '\033[0;34m'
-    PURPLE = '\033[0;35m'
-    CYAN = '\033[0;36m'
-    NC = '\033[0m'  # No Color
+    RED = '\033[0;31m' if _USE_COLOR else ''
+    GREEN = '\033[0;32m' if _USE_COLOR else ''
+    YELLOW = '\033[1;33m' if _USE_COLOR else ''
+    BLUE = '\033[0;34m' if _USE_COLOR else ''
+    PURPLE = '\033[0;35m' if _USE_COLOR else ''
+    CYAN = '\033[0;36m' if _USE_COLOR else ''
+    NC = '\033[0m' if _USE_COLOR else ''  # No Color
+
+# 阶段状态图标
+STATUS_ICONS = {
+    'pending': '⏸️',
+    'in_progress': '🔄',
+    'completed': '✅',
+    'failed': '❌'
+}
+
+# 阶段状态颜色
+STATUS_COLORS = {
+    'pending': Colors.YELLOW,
+    'in_progress': Colors.BLUE,
+    'completed': Colors.GREEN,
+    'failed': Colors.RED
+}
+
+# 标题横幅
+HEADER_BANNER = f"""{Colors.PURPLE}
+╔══════════════════════════════════════╗
+║       AceFlow v3.0 阶段管理          ║
+║      AI Agent 工作流控制工具         ║
+╚══════════════════════════════════════╝{Colors.NC}"""
 
 class Logger:
     """日志工具类"""
@@ -49,17 +122,18 @@ class Logger:
     
     @staticmethod
     def header():
-        print(f"""{Colors.PURPLE}
-╔══════════════════════════════════════╗
-║       AceFlow v3.0 阶段管理          ║
-║      AI Agent 工作流控制工具         ║
-╚══════════════════════════════════════╝{Colors.NC}""")
+        print(HEADER_BANNER)
 
 class AceFlowStage:
     """AceFlow 阶段管理类"""
     
     def __init__(self, project_dir: str = "."):
         self.logger = Logger()
+        self._completed_set = None
+        self._configure_paths(project_dir)
+
+    def _configure_paths(self, project_dir: str):
+        """设置项目目录及状态文件路径"""
         self.project_dir = Path(project_dir).resolve()
         self.aceflow_result_dir = self.project_dir / "aceflow_result"
         self.current_state_file = self.aceflow_result_dir / "current_state.json"
@@ -97,85 +171,141 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
 """
         print(help_text)
 
+    @staticmethod
+    def _read_bytes(path: Path) -> bytearray:
+        """按文件大小一次性读入预分配缓冲区"""
+        with open(path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            buf = bytearray(size)
+            with memoryview(buf) as view:
+                read = 0
+                while read < size:
+                    n = f.readinto(view[read:])
+                    if not n:
+                        break
+                    read += n
+        if read < size:
+            del buf[read:]
+        return buf
+
+    @staticmethod
+    def _json_loads(data: bytes) -> Any:
+        """解析JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    def _json_dumps(obj: Any) -> bytes:
+        """序列化为缩进格式的UTF-8 JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
     def load_current_state(self) -> Optional[Dict]:
         """加载当前项目状态"""
-        if not self.current_state_file.exists():
+        # 重新加载状态后已完成阶段集合需重建
+        self._completed_set = None
+        try:
+            return self._json_loads(self._read_bytes(self.current_state_file))
+        except FileNotFoundError:
             self.logger.error(f"项目状态文件不存在: {self.current_state_file}")
             self.logger.info("请确保在AceFlow项目目录中运行此命令")
             return None
-        
-        try:
-            with open(self.current_state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
         except json.JSONDecodeError as e:
             self.logger.error(f"项目状态文件格式错误: {e}")
             return None
 
-    def save_current_state(self, state: Dict):
+    @classmethod
+    def _write_json_atomic(cls, path: Path, obj: Any):
+        """原子写入JSON文件"""
+        cls._write_bytes_atomic(path, cls._json_dumps(obj))
+
+    @staticmethod
+    def _write_bytes_atomic(path: Path, data: bytes):
+        """原子写入文件: 一次性写入临时文件后替换目标文件"""
+        tmp_path = path.with_name(path.name + '.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _now_iso() -> str:
+        """获取当前UTC时间的ISO格式字符串"""
+        from datetime import datetime, timezone  # 延迟导入，仅写操作需要
+        return datetime.now(timezone.utc).isoformat()
+
+    def save_current_state(self, state: Dict, now: Optional[str] = None):
         """保存当前项目状态"""
-        state['project']['last_updated'] = datetime.now(timezone.utc).isoformat()
+        state['project']['last_updated'] = now or self._now_iso()
+        
+        self._write_json_atomic(self.current_state_file, state)
+
+    def _save_all(self, state: Dict, progress: Optional[Dict] = None,
+                  now: Optional[str] = None):
+        """保存项目状态及阶段进度 (先完成全部序列化，再依次写入)"""
+        state['project']['last_updated'] = now or self._now_iso()
         
-        with open(self.current_state_file, 'w', encoding='utf-8') as f:
-            json.dump(state, f, ensure_ascii=False, indent=2)
+        writes = [(self.current_state_file, self._json_dumps(state))]
+        if progress is not None:
+            writes.append((self.stage_progress_file, self._json_dumps(progress)))
+        
+        for path, data in writes:
+            self._write_bytes_atomic(path, data)
 
     def load_stage_progress(self) -> Optional[Dict]:
         """加载阶段进度信息"""
-        if not self.stage_progress_file.exists():
+        try:
+            return self._json_loads(self._read_bytes(self.stage_progress_file))
+        except FileNotFoundError:
             self.logger.error(f"阶段进度文件不存在: {self.stage_progress_file}")
             return None
-        
-        try:
-            with open(self.stage_progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
         except json.JSONDecodeError as e:
             self.logger.error(f"阶段进度文件格式错误: {e}")
             return None
 
     def save_stage_progress(self, progress: Dict):
         """保存阶段进度信息"""
-        with open(self.stage_progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress, f, ensure_ascii=False, indent=2)
+        self._write_json_atomic(self.stage_progress_file, progress)
 
-    def get_stage_order(self, mode: str) -> List[str]:
+    def _mark_completed(self, flow: Dict, stage: str):
+        """将阶段加入已完成列表 (通过集合判重，避免线性查找)"""
+        if self._completed_set is None:
+            self._completed_set = set(flow['completed_stages'])
+        if stage not in self._completed_set:
+            self._completed_set.add(stage)
+            flow['completed_stages'].append(stage)
+
+    def _confirm(self, prompt: str, force: bool = False) -> bool:
+        """请求用户确认操作 (非交互环境下视为取消)"""
+        if force:
+            return True
+        if not sys.stdin or not sys.stdin.isatty():
+            self.logger.warning("非交互模式下无法确认操作，请使用 --force 参数")
+            return False
+        response = input(prompt).strip().lower()
+        return response in ('y', 'yes')
+
+    def get_stage_order(self, mode: str) -> Tuple[str, ...]:
         """获取阶段顺序"""
-        stage_orders = {
-            "minimal": ["analysis", "planning", "implementation", "validation"],
-            "standard": ["user_stories", "tasks_planning", "test_design", 
-                        "implementation", "testing", "review"],
-            "complete": ["s1_user_story", "s2_tasks_group", "s3_testcases", 
-                        "s4_implementation", "s5_test_report", "s6_codereview", 
-                        "s7_demo_script", "s8_summary_report"],
-            "smart": ["analysis", "planning", "implementation", "validation"]
-        }
-        return stage_orders.get(mode, [])
+        return STAGE_ORDERS.get(mode, ())
+
+    def _stage_meta(self, state: Dict) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+        """获取项目模式对应的阶段顺序及阶段下标映射"""
+        mode = state['project']['mode']
+        return self.get_stage_order(mode), _stage_index(mode)
 
     def get_stage_display_name(self, stage: str) -> str:
         """获取阶段显示名称"""
-        display_names = {
-            # Minimal/Smart 模式
-            "analysis": "需求分析",
-            "planning": "规划设计",
-            "implementation": "功能实现",
-            "validation": "验证测试",
-            
-            # Standard 模式
-            "user_stories": "用户故事",
-            "tasks_planning": "任务规划",
-            "test_design": "测试设计",
-            "testing": "测试执行",
-            "review": "代码评审",
-            
-            # Complete 模式
-            "s1_user_story": "S1-用户故事分析",
-            "s2_tasks_group": "S2-任务分组规划",
-            "s3_testcases": "S3-测试用例设计",
-            "s4_implementation": "S4-功能实现",
-            "s5_test_report": "S5-测试报告",
-            "s6_codereview": "S6-代码评审",
-            "s7_demo_script": "S7-演示脚本",
-            "s8_summary_report": "S8-项目总结"
-        }
-        return display_names.get(stage, stage)
+        return STAGE_DISPLAY_NAMES.get(stage, stage)
 
     def show_status(self, verbose: bool = False):
         """显示当前阶段状态"""
@@ -183,59 +313,51 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         if not state:
             return False
         
-        progress = self.load_stage_progress()
-        if not progress:
-            return False
+        # 仅详细模式需要阶段进度信息
+        progress = None
+        if verbose:
+            progress = self.load_stage_progress()
+            if not progress:
+                return False
         
         project = state['project']
         flow = state['flow']
         
         self.logger.header()
-        print(f"{Colors.CYAN}项目状态概览{Colors.NC}")
-        print("─" * 40)
-        print(f"📋 项目名称: {project['name']}")
-        print(f"🔄 流程模式: {project['mode']}")
-        print(f"📊 当前阶段: {Colors.BLUE}{self.get_stage_display_name(flow['current_stage'])}{Colors.NC}")
-        print(f"📈 完成进度: {flow['progress_percentage']}%")
+        out = [
+            f"{Colors.CYAN}项目状态概览{Colors.NC}",
+            "─" * 40,
+            f"📋 项目名称: {project['name']}",
+            f"🔄 流程模式: {project['mode']}",
+            f"📊 当前阶段: {Colors.BLUE}{self.get_stage_display_name(flow['current_stage'])}{Colors.NC}",
+            f"📈 完成进度: {flow['progress_percentage']}%",
+        ]
         
         if flow['next_stage']:
-            print(f"➡️  下一阶段: {self.get_stage_display_name(flow['next_stage'])}")
+            out.append(f"➡️  下一阶段: {self.get_stage_display_name(flow['next_stage'])}")
         
-        print(f"🕒 最后更新: {project['last_updated']}")
+        out.append(f"🕒 最后更新: {project['last_updated']}")
         
         if verbose:
-            print(f"\n{Colors.CYAN}详细阶段信息{Colors.NC}")
-            print("─" * 40)
+            stages = progress['stages']
+            out.append(f"\n{Colors.CYAN}详细阶段信息{Colors.NC}")
+            out.append("─" * 40)
             
             stage_order = self.get_stage_order(project['mode'])
             for stage in stage_order:
-                if stage in progress['stages']:
-                    stage_info = progress['stages'][stage]
+                if stage in stages:
+                    stage_info = stages[stage]
                     status = stage_info['status']
                     stage_progress = stage_info.get('progress', 0)
                     
-                    # 状态图标
-                    status_icons = {
-                        'pending': '⏸️',
-                        'in_progress': '🔄',
-                        'completed': '✅',
-                        'failed': '❌'
-                    }
-                    icon = status_icons.get(status, '❓')
+                    icon = STATUS_ICONS.get(status, '❓')
+                    color = STATUS_COLORS.get(status, Colors.NC)
                     
-                    # 状态颜色
-                    status_colors = {
-                        'pending': Colors.YELLOW,
-                        'in_progress': Colors.BLUE,
-                        'completed': Colors.GREEN,
-                        'failed': Colors.RED
-                    }
-                    color = status_colors.get(status, Colors.NC)
-                    
-                    print(f"{icon} {self.get_stage_display_name(stage):<20} "
-                          f"{color}{status}{Colors.NC} ({stage_progress}%)")
+                    out.append(f"{icon} {self.get_stage_display_name(stage):<20} "
+                               f"{color}{status}{Colors.NC} ({stage_progress}%)")
         
-        print("")
+        out.append("")
+        sys.stdout.write("\n".join(out) + "\n")
         return True
 
     def list_stages(self):
@@ -247,13 +369,12 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         mode = state['project']['mode']
         stage_order = self.get_stage_order(mode)
         
-        print(f"{Colors.CYAN}{mode.upper()} 模式阶段列表{Colors.NC}")
-        print("─" * 40)
-        
-        for i, stage in enumerate(stage_order, 1):
-            print(f"{i:2d}. {stage:<20} - {self.get_stage_display_name(stage)}")
+        out = [f"{Colors.CYAN}{mode.upper()} 模式阶段列表{Colors.NC}", "─" * 40]
+        out.extend(f"{i:2d}. {stage:<20} - {self.get_stage_display_name(stage)}"
+                   for i, stage in enumerate(stage_order, 1))
+        out.append("")
         
-        print("")
+        sys.stdout.write("\n".join(out) + "\n")
         return True
 
     def next_stage(self, force: bool = False, verbose: bool = False):
@@ -266,8 +387,11 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         if not progress:
             return False
         
-        current_stage = state['flow']['current_stage']
-        next_stage = state['flow']['next_stage']
+        flow = state['flow']
+        stages = progress['stages']
+        
+        current_stage = flow['current_stage']
+        next_stage = flow['next_stage']
         
         if not next_stage:
             self.logger.info("已经是最后一个阶段")
@@ -275,49 +399,44 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         
         if current_stage != "initialized":
             # 检查当前阶段是否完成
-            if current_stage in progress['stages']:
-                current_status = progress['stages'][current_stage]['status']
+            if current_stage in stages:
+                current_status = stages[current_stage]['status']
                 if current_status != 'completed' and not force:
                     self.logger.warning(f"当前阶段 '{self.get_stage_display_name(current_stage)}' 未完成")
-                    response = input("是否强制推进到下一阶段? (y/N): ").strip().lower()
-                    if response not in ['y', 'yes']:
+                    if not self._confirm("是否强制推进到下一阶段? (y/N): "):
                         self.logger.info("操作已取消")
                         return False
         
         # 更新状态
         old_stage = current_stage
-        state['flow']['current_stage'] = next_stage
+        flow['current_stage'] = next_stage
         
         # 计算下一个阶段
-        mode = state['project']['mode']
-        stage_order = self.get_stage_order(mode)
+        stage_order, stage_index = self._stage_meta(state)
         
-        try:
-            current_index = stage_order.index(next_stage)
-            if current_index + 1 < len(stage_order):
-                state['flow']['next_stage'] = stage_order[current_index + 1]
-            else:
-                state['flow']['next_stage'] = None
-        except ValueError:
-            state['flow']['next_stage'] = None
+        current_index = stage_index.get(next_stage)
+        if current_index is not None and current_index + 1 < len(stage_order):
+            flow['next_stage'] = stage_order[current_index + 1]
+        else:
+            flow['next_stage'] = None
         
         # 更新完成的阶段列表
-        if old_stage != "initialized" and old_stage not in state['flow']['completed_stages']:
-            state['flow']['completed_stages'].append(old_stage)
+        if old_stage != "initialized":
+            self._mark_completed(flow, old_stage)
         
         # 计算进度百分比
-        completed_count = len(state['flow']['completed_stages'])
+        completed_count = len(flow['completed_stages'])
         total_stages = len(stage_order)
-        state['flow']['progress_percentage'] = int((completed_count / total_stages) * 100)
+        flow['progress_percentage'] = int((completed_count / total_stages) * 100)
         
         # 更新阶段进度
-        if next_stage in progress['stages']:
-            progress['stages'][next_stage]['status'] = 'in_progress'
-            progress['stages'][next_stage]['last_updated'] = datetime.now(timezone.utc).isoformat()
+        now = self._now_iso()
+        if next_stage in stages:
+            stages[next_stage]['status'] = 'in_progress'
+            stages[next_stage]['last_updated'] = now
         
         # 保存状态
-        self.save_current_state(state)
-        self.save_stage_progress(progress)
+        self._save_all(state, progress, now)
         
         self.logger.success(f"已推进到阶段: {self.get_stage_display_name(next_stage)}")
         
@@ -336,47 +455,44 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         if not progress:
             return False
         
-        mode = state['project']['mode']
-        stage_order = self.get_stage_order(mode)
+        flow = state['flow']
+        stages = progress['stages']
+        
+        stage_order, stage_index = self._stage_meta(state)
         
-        if target_stage not in stage_order:
+        if target_stage not in stage_index:
             self.logger.error(f"无效的阶段名称: {target_stage}")
             self.logger.info(f"可用阶段: {', '.join(stage_order)}")
             return False
         
-        current_stage = state['flow']['current_stage']
+        current_stage = flow['current_stage']
         
         if current_stage == target_stage:
             self.logger.info(f"已经在目标阶段: {self.get_stage_display_name(target_stage)}")
             return True
         
-        if not force:
-            response = input(f"确认跳转到阶段 '{self.get_stage_display_name(target_stage)}'? (y/N): ").strip().lower()
-            if response not in ['y', 'yes']:
-                self.logger.info("操作已取消")
-                return False
+        if not self._confirm(f"确认跳转到阶段 '{self.get_stage_display_name(target_stage)}'? (y/N): ", force):
+            self.logger.info("操作已取消")
+            return False
         
         # 更新状态
-        state['flow']['current_stage'] = target_stage
+        flow['current_stage'] = target_stage
         
         # 计算下一个阶段
-        try:
-            current_index = stage_order.index(target_stage)
-            if current_index + 1 < len(stage_order):
-                state['flow']['next_stage'] = stage_order[current_index + 1]
-            else:
-                state['flow']['next_stage'] = None
-        except ValueError:
-            state['flow']['next_stage'] = None
+        current_index = stage_index[target_stage]
+        if current_index + 1 < len(stage_order):
+            flow['next_stage'] = stage_order[current_index + 1]
+        else:
+            flow['next_stage'] = None
         
         # 更新阶段进度
-        if target_stage in progress['stages']:
-            progress['stages'][target_stage]['status'] = 'in_progress'
-            progress['stages'][target_stage]['last_updated'] = datetime.now(timezone.utc).isoformat()
+        now = self._now_iso()
+        if target_stage in stages:
+            stages[target_stage]['status'] = 'in_progress'
+            stages[target_stage]['last_updated'] = now
         
         # 保存状态
-        self.save_current_state(state)
-        self.save_stage_progress(progress)
+        self._save_all(state, progress, now)
         
         self.logger.success(f"已跳转到阶段: {self.get_stage_display_name(target_stage)}")
         return True
@@ -391,35 +507,34 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         if not progress:
             return False
         
-        if stage not in progress['stages']:
+        flow = state['flow']
+        stages = progress['stages']
+        
+        if stage not in stages:
             self.logger.error(f"阶段不存在: {stage}")
             return False
         
-        if not force:
-            response = input(f"确认标记阶段 '{self.get_stage_display_name(stage)}' 为完成? (y/N): ").strip().lower()
-            if response not in ['y', 'yes']:
-                self.logger.info("操作已取消")
-                return False
+        if not self._confirm(f"确认标记阶段 '{self.get_stage_display_name(stage)}' 为完成? (y/N): ", force):
+            self.logger.info("操作已取消")
+            return False
         
         # 更新阶段状态
-        progress['stages'][stage]['status'] = 'completed'
-        progress['stages'][stage]['progress'] = 100
-        progress['stages'][stage]['last_updated'] = datetime.now(timezone.utc).isoformat()
+        now = self._now_iso()
+        stages[stage]['status'] = 'completed'
+        stages[stage]['progress'] = 100
+        stages[stage]['last_updated'] = now
         
         # 更新完成阶段列表
-        if stage not in state['flow']['completed_stages']:
-            state['flow']['completed_stages'].append(stage)
+        self._mark_completed(flow, stage)
         
         # 重新计算进度
-        mode = state['project']['mode']
-        stage_order = self.get_stage_order(mode)
-        completed_count = len(state['flow']['completed_stages'])
+        stage_order, _ = self._stage_meta(state)
+        completed_count = len(flow['completed_stages'])
         total_stages = len(stage_order)
-        state['flow']['progress_percentage'] = int((completed_count / total_stages) * 100)
+        flow['progress_percentage'] = int((completed_count / total_stages) * 100)
         
         # 保存状态
-        self.save_current_state(state)
-        self.save_stage_progress(progress)
+        self._save_all(state, progress, now)
         
         self.logger.success(f"阶段 '{self.get_stage_display_name(stage)}' 已标记为完成")
         return True
@@ -434,51 +549,102 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
         if not progress:
             return False
         
-        mode = state['project']['mode']
-        stage_order = self.get_stage_order(mode)
+        flow = state['flow']
+        stages = progress['stages']
+        
+        stage_order, stage_index = self._stage_meta(state)
         
-        if target_stage not in stage_order:
+        if target_stage not in stage_index:
             self.logger.error(f"无效的阶段名称: {target_stage}")
             return False
         
         if not force:
             self.logger.warning("重置操作将清除目标阶段之后的所有进度")
-            response = input(f"确认重置到阶段 '{self.get_stage_display_name(target_stage)}'? (y/N): ").strip().lower()
-            if response not in ['y', 'yes']:
+            if not self._confirm(f"确认重置到阶段 '{self.get_stage_display_name(target_stage)}'? (y/N): "):
                 self.logger.info("操作已取消")
                 return False
         
-        target_index = stage_order.index(target_stage)
-        
-        # 重置后续阶段状态
-        for i in range(target_index + 1, len(stage_order)):
-            stage = stage_order[i]
-            if stage in progress['stages']:
-                progress['stages'][stage]['status'] = 'pending'
-                progress['stages'][stage]['progress'] = 0
-                if 'last_updated' in progress['stages'][stage]:
-                    del progress['stages'][stage]['last_updated']
+        target_index = stage_index[target_stage]
+        
+        # 重置后续阶段状态 (仅在确有变更时重写进度文件)
+        progress_dirty = False
+        for stage in stage_order[target_index + 1:]:
+            stage_info = stages.get(stage)
+            if stage_info is None:
+                continue
+            if (stage_info.get('status') != 'pending' or stage_info.get('progress', 0) != 0
+                    or 'last_updated' in stage_info):
+                stage_info['status'] = 'pending'
+                stage_info['progress'] = 0
+                stage_info.pop('last_updated', None)
+                progress_dirty = True
         
         # 更新当前状态
-        state['flow']['current_stage'] = target_stage
-        state['flow']['next_stage'] = stage_order[target_index + 1] if target_index + 1 < len(stage_order) else None
-        state['flow']['completed_stages'] = [s for s in state['flow']['completed_stages'] 
-                                           if stage_order.index(s) < target_index]
+        flow['current_stage'] = target_stage
+        flow['next_stage'] = stage_order[target_index + 1] if target_index + 1 < len(stage_order) else None
+        flow['completed_stages'] = [s for s in flow['completed_stages']
+                                    if stage_index.get(s, -1) < target_index]
+        self._completed_set = set(flow['completed_stages'])
         
         # 重新计算进度
-        completed_count = len(state['flow']['completed_stages'])
+        completed_count = len(flow['completed_stages'])
         total_stages = len(stage_order)
-        state['flow']['progress_percentage'] = int((completed_count / total_stages) * 100)
+        flow['progress_percentage'] = int((completed_count / total_stages) * 100)
         
         # 保存状态
-        self.save_current_state(state)
-        self.save_stage_progress(progress)
+        self._save_all(state, progress if progress_dirty else None)
         
         self.logger.success(f"已重置到阶段: {self.get_stage_display_name(target_stage)}")
         return True
 
-    def run(self):
-        """主运行函数"""
+    # 命令分发表: 命令名 -> (处理函数, 是否需要指定阶段)
+    COMMANDS = {
+        'status': (lambda self, args: self.show_status(args.verbose), False),
+        'list': (lambda self, args: self.list_stages(), False),
+        'next': (lambda self, args: self.next_stage(args.force, args.verbose), False),
+        'goto': (lambda self, args: self.goto_stage(args.stage, args.force), True),
+        'complete': (lambda self, args: self.complete_stage(args.stage, args.force), True),
+        'reset': (lambda self, args: self.reset_stage(args.stage, args.force), True),
+    }
+
+    @staticmethod
+    def _parse_argv(argv: List[str]) -> Optional[SimpleNamespace]:
+        """快速解析常用命令行参数; 遇到无法识别的参数时返回 None，交由 argparse 处理"""
+        args = SimpleNamespace(command=None, stage=None, directory='.',
+                               force=False, verbose=False)
+        positionals = []
+        i = 0
+        while i < len(argv):
+            arg = argv[i]
+            if arg in ('-f', '--force'):
+                args.force = True
+            elif arg in ('-v', '--verbose'):
+                args.verbose = True
+            elif arg in ('-d', '--directory'):
+                i += 1
+                if i >= len(argv) or argv[i].startswith('-'):
+                    return None
+                args.directory = argv[i]
+            elif arg.startswith('--directory='):
+                args.directory = arg[len('--directory='):]
+            elif arg.startswith('-'):
+                # -h/--help、--version、组合短参数及错误参数均由 argparse 处理
+                return None
+            else:
+                positionals.append(arg)
+            i += 1
+        
+        if len(positionals) > 2:
+            return None
+        positionals += [None] * (2 - len(positionals))
+        args.command, args.stage = positionals
+        return args
+
+    @staticmethod
+    def _parse_argv_full(argv: List[str]):
+        """使用 argparse 解析命令行参数 (帮助、版本及错误提示)"""
+        import argparse  # 延迟导入，仅在快速解析无法处理时使用
+        
         parser = argparse.ArgumentParser(
             description="AceFlow v3.0 阶段管理脚本 (Python版本)",
             formatter_class=argparse.RawDescriptionHelpFormatter
@@ -501,14 +667,20 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
                           action='version',
                           version=f'AceFlow Stage Manager v{VERSION}')
         
-        args = parser.parse_args()
+        return parser.parse_args(argv)
+
+    def run(self):
+        """主运行函数"""
+        argv = sys.argv[1:]
+        args = self._parse_argv(argv) or self._parse_argv_full(argv)
         
         if not args.command:
             self.show_help()
             return 1
         
         # 设置项目目录
-        self.__init__(args.directory)
+        if args.directory != '.':
+            self._configure_paths(args.directory)
         
         # 检查项目目录
         if not self.aceflow_result_dir.exists():
@@ -517,39 +689,19 @@ AceFlow v3.0 阶段管理脚本 (Python版本)
             return 1
         
         # 执行命令
+        entry = self.COMMANDS.get(args.command)
+        if entry is None:
+            self.logger.error(f"未知命令: {args.command}")
+            self.show_help()
+            return 1
+        
+        handler, requires_stage = entry
+        if requires_stage and not args.stage:
+            self.logger.error(f"{args.command} 命令需要指定目标阶段")
+            return 1
+        
         try:
-            if args.command == 'status':
-                return 0 if self.show_status(args.verbose) else 1
-            
-            elif args.command == 'list':
-                return 0 if self.list_stages() else 1
-            
-            elif args.command == 'next':
-                return 0 if self.next_stage(args.force, args.verbose) else 1
-            
-            elif args.command == 'goto':
-                if not args.stage:
-                    self.logger.error("goto 命令需要指定目标阶段")
-                    return 1
-                return 0 if self.goto_stage(args.stage, args.force) else 1
-            
-            elif args.command == 'complete':
-                if not args.stage:
-                    self.logger.error("complete 命令需要指定目标阶段")
-                    return 1
-                return 0 if self.complete_stage(args.stage, args.force) else 1
-            
-            elif args.command == 'reset':
-                if not args.stage:
-                    self.logger.error("reset 命令需要指定目标阶段")
-                    return 1
-                return 0 if self.reset_stage(args.stage, args.force) else 1
-            
-            else:
-                self.logger.error(f"未知命令: {args.command}")
-                self.show_help()
-                return 1
-                
+            return 0 if handler(self, args) else 1
         except KeyboardInterrupt:
             print(f"\n{Colors.YELLOW}操作被用户中断{Colors.NC}")
             return 1
@@ -7,44 +7,63 @@ AI Agent 增强层模板系统工具
 import argparse
 import json
 import os
+import re
 import shutil
+import stat
 import subprocess
 import sys
-import yaml
+from collections import Counter
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选加速依赖，缺失时回退到标准库 json
+    orjson = None
+
+
+# 设置 NO_COLOR 或输出重定向到文件/管道时不使用色彩
+_USE_COLOR = ('NO_COLOR' not in os.environ
+              and sys.stdout is not None and sys.stdout.isatty())
 
 
 class Colors:
     """ANSI颜色代码"""
-    RED = '\033[0;31m'
-    GREEN = '\033[0;32m'
-    YELLOW = '\033[1;33m'
-    BLUE = '\033[0;34m'
-    PURPLE = '\033[0;35m'
-    CYAN = '\033[0;36m'
-    GRAY = '\033[0;37m'
-    NC = '\033[0m'  # No Color
+    RED = '\033[0;31m' if _USE_COLOR else ''
+    GREEN = '\033[0;32m' if _USE_COLOR else ''
+    YELLOW = '\033[1;33m' if _USE_COLOR else ''
+    BLUE = '\033[0;34m' if _USE_COLOR else ''
+    PURPLE = '\033[0;35m' if _USE_COLOR else ''
+    CYAN = '\033[0;36m' if _USE_COLOR else ''
+    GRAY = '\033[0;37m' if _USE_COLOR else ''
+    NC = '\033[0m' if _USE_COLOR else ''  # No Color
 
 
 class TemplateLogger:
     """模板管理日志记录器"""
     
+    # 各级别的日志前缀在类定义时预先拼接
+    _INFO = f"{Colors.BLUE}[INFO]{Colors.NC} "
+    _SUCCESS = f"{Colors.GREEN}[SUCCESS]{Colors.NC} "
+    _WARNING = f"{Colors.YELLOW}[WARNING]{Colors.NC} "
+    _ERROR = f"{Colors.RED}[ERROR]{Colors.NC} "
+    
     def __init__(self):
         pass
     
     def info(self, message: str):
-        print(f"{Colors.BLUE}[INFO]{Colors.NC} {message}")
+        print(self._INFO, message, sep='')
     
     def success(self, message: str):
-        print(f"{Colors.GREEN}[SUCCESS]{Colors.NC} {message}")
+        print(self._SUCCESS, message, sep='')
     
     def warning(self, message: str):
-        print(f"{Colors.YELLOW}[WARNING]{Colors.NC} {message}")
+        print(self._WARNING, message, sep='')
     
     def error(self, message: str):
-        print(f"{Colors.RED}[ERROR]{Colors.NC} {message}")
+        print(self._ERROR, message, sep='')
     
     def header(self):
         header_text = f"""{Colors.PURPLE}
@@ -60,31 +79,154 @@ class AceFlowTemplateManager:
     
     VERSION = "3.0.0"
     
+    # 配置备份归档的后缀及其包含的项目内路径
+    BACKUP_SUFFIX = ".tar.gz"
+    BACKUP_ITEMS = (".aceflow", "aceflow_result/current_state.json", ".clinerules")
+    BACKUP_HASH_FILE = ".last_hash"
+    
+    # 模板目录中不属于流程模式的特殊目录
+    SKIP_TEMPLATE_NAMES = frozenset({"document_templates"})
+    SKIP_TEMPLATE_RE = re.compile(r"s[1-8]_")
+    
+    # 完整模式模板应包含的阶段
+    COMPLETE_STAGES = ("s1_user_story", "s2_tasks_group", "s3_testcases",
+                       "s4_implementation", "s5_test_report", "s6_codereview",
+                       "s7_demo_script", "s8_summary_report")
+    COMPLETE_STAGE_RE = re.compile(b"|".join(re.escape(stage.encode()) for stage in COMPLETE_STAGES))
+    
     def __init__(self, project_dir: str = "."):
         self.project_dir = Path(project_dir).resolve()
         self.logger = TemplateLogger()
+        self._yaml_cache: Dict[Tuple[str, int, int], object] = {}
         
-        # 获取AceFlow根目录
-        script_path = Path(__file__).resolve()
-        self.aceflow_home = Path(os.environ.get('ACEFLOW_HOME', script_path.parent.parent))
+        # 获取AceFlow根目录 (未设置 ACEFLOW_HOME 时才需要解析脚本路径)
+        aceflow_home = os.environ.get('ACEFLOW_HOME')
+        if aceflow_home is None:
+            self.aceflow_home = Path(__file__).resolve().parent.parent
+        else:
+            self.aceflow_home = Path(aceflow_home)
     
-    def get_template_dir(self) -> Path:
-        """获取模板目录"""
+    @cached_property
+    def template_dir(self) -> Path:
+        """模板目录"""
         return self.aceflow_home / "templates"
     
-    def validate_mode(self, mode: str) -> bool:
-        """验证模式是否存在"""
-        template_dir = self.get_template_dir()
-        mode_dir = template_dir / mode
-        return mode_dir.exists() and mode_dir.is_dir()
+    @classmethod
+    def _scan_tree(cls, path: Path):
+        """使用 os.scandir 递归遍历目录，依次产出各条目 (含子目录) 的 DirEntry"""
+        with os.scandir(path) as it:
+            for entry in it:
+                yield entry
+                if entry.is_dir(follow_symlinks=False):
+                    yield from cls._scan_tree(entry.path)
     
+    @staticmethod
+    def _copy_file(entry: os.DirEntry, dst: str):
+        """复制单个文件并保留权限和时间戳 (Linux 下使用 os.sendfile 在内核中复制)"""
+        if not sys.platform.startswith('linux'):
+            shutil.copy2(entry.path, dst)
+            return
+        
+        st = entry.stat()
+        src_fd = os.open(entry.path, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                offset = 0
+                while offset < st.st_size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                os.fchmod(dst_fd, stat.S_IMODE(st.st_mode))
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    
+    @classmethod
+    def _copy_tree(cls, src: Path, dst: Path, dirs_exist_ok: bool = False):
+        """使用 os.scandir 递归复制目录 (复用 DirEntry 缓存的类型和 stat 信息)"""
+        os.makedirs(dst, exist_ok=dirs_exist_ok)
+        with os.scandir(src) as it:
+            for entry in it:
+                target = os.path.join(dst, entry.name)
+                if entry.is_dir():
+                    cls._copy_tree(entry.path, target, dirs_exist_ok)
+                else:
+                    cls._copy_file(entry, target)
+        shutil.copystat(src, dst)
+    
+    @staticmethod
+    def _yaml_safe_classes():
+        """获取安全的 YAML Loader/Dumper，优先使用 libyaml 提供的C实现"""
+        import yaml  # 延迟导入，仅解析模板配置的命令需要
+        
+        return (getattr(yaml, 'CSafeLoader', yaml.SafeLoader),
+                getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+    
+    def _load_template_yaml(self, path: Path):
+        """解析YAML文件，按 (路径, 修改时间, 大小) 缓存结果; 调用方不应修改返回值"""
+        import yaml  # 延迟导入，仅解析模板配置的命令需要
+        
+        st = path.stat()
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        if key not in self._yaml_cache:
+            loader, _ = self._yaml_safe_classes()
+            with open(path, 'rb') as f:
+                self._yaml_cache[key] = yaml.load(f, Loader=loader)
+        return self._yaml_cache[key]
+    
+    @classmethod
+    def _iter_rel_files(cls, root: Path):
+        """依次产出目录下所有文件相对于根目录的路径字符串"""
+        root_len = len(os.path.join(str(root), ''))
+        for entry in cls._scan_tree(root):
+            if entry.is_file():
+                yield entry.path[root_len:]
+    
+    def validate_mode(self, mode: str) -> Optional[Path]:
+        """验证模式是否存在，存在时返回模板目录，否则返回None"""
+        mode_dir = self.template_dir / mode
+        return mode_dir if mode_dir.is_dir() else None
+    
+    @staticmethod
+    def _json_loads(data: bytes) -> Any:
+        """解析JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    @staticmethod
+    def _json_dumps(obj: Any) -> bytes:
+        """序列化为缩进格式的UTF-8 JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    @staticmethod
+    def _write_bytes_atomic(path: Path, data: bytes):
+        """原子写入文件: 一次性写入临时文件后替换目标文件"""
+        tmp_path = path.with_name(path.name + '.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
     def get_current_mode(self) -> str:
         """获取当前项目模式"""
         state_file = self.project_dir / "aceflow_result" / "current_state.json"
         if state_file.exists():
             try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = self._json_loads(state_file.read_bytes())
                 return data.get('project', {}).get('mode', 'unknown')
             except Exception:
                 return "unknown"
@@ -92,7 +234,7 @@ class AceFlowTemplateManager:
     
     def list_templates(self, verbose: bool = False) -> bool:
         """列出所有可用模板"""
-        template_dir = self.get_template_dir()
+        template_dir = self.template_dir
         
         self.logger.info(f"扫描模板目录: {template_dir}")
         
@@ -100,27 +242,39 @@ class AceFlowTemplateManager:
             self.logger.error(f"模板目录不存在: {template_dir}")
             return False
         
-        print()
-        print(f"{Colors.CYAN}可用模板列表{Colors.NC}")
-        print("─────────────────────────────")
+        # 列表内容先收集，遍历结束后一次性输出
+        lines = [
+            '',
+            f"{Colors.CYAN}可用模板列表{Colors.NC}",
+            "─────────────────────────────",
+        ]
         
         current_mode = self.get_current_mode()
-        template_count = 0
         
-        # 需要跳过的特殊目录
-        skip_patterns = [
-            "document_templates",
-            "s1_", "s2_", "s3_", "s4_", "s5_", "s6_", "s7_", "s8_"
-        ]
+        with os.scandir(template_dir) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
         
-        for mode_dir in sorted(template_dir.iterdir()):
-            if mode_dir.is_dir():
-                mode = mode_dir.name
-                
-                # 跳过特殊目录
-                if any(mode.startswith(pattern) for pattern in skip_patterns):
-                    continue
-                
+        # 跳过特殊目录
+        modes = [entry.name for entry in entries
+                 if entry.is_dir()
+                 and entry.name not in self.SKIP_TEMPLATE_NAMES
+                 and not self.SKIP_TEMPLATE_RE.match(entry.name)]
+        template_count = len(modes)
+        
+        details = None
+        executor = None
+        if verbose:
+            mode_dirs = [template_dir / mode for mode in modes]
+            if len(mode_dirs) >= 3:
+                # 模板较多时由线程池预先读取后续模板的文件，map 保持输出顺序
+                from concurrent.futures import ThreadPoolExecutor
+                executor = ThreadPoolExecutor(max_workers=4)
+                details = executor.map(self._template_details, mode_dirs)
+            else:
+                details = map(self._template_details, mode_dirs)
+        
+        try:
+            for mode in modes:
                 status = ""
                 icon = "📋"
                 
@@ -128,46 +282,16 @@ class AceFlowTemplateManager:
                     status = f" {Colors.GREEN}(当前使用){Colors.NC}"
                     icon = "📌"
                 
-                print(f"  {icon} {Colors.BLUE}{mode}{Colors.NC}{status}")
-                template_count += 1
+                lines.append(f"  {icon} {Colors.BLUE}{mode}{Colors.NC}{status}")
                 
-                if verbose:
+                if details is not None:
                     # 显示模板详细信息
-                    template_file = mode_dir / "template.yaml"
-                    readme_file = mode_dir / "README.md"
-                    
-                    if template_file.exists():
-                        try:
-                            with open(template_file, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            # 简单提取描述信息
-                            description = "无描述"
-                            for line in content.split('\n'):
-                                if line.strip().startswith('description:'):
-                                    description = line.split(':', 1)[1].strip().strip('"\'')
-                                    break
-                            print(f"    📝 描述: {description}")
-                        except Exception:
-                            print("    📝 描述: 读取失败")
-                    
-                    if readme_file.exists():
-                        try:
-                            with open(readme_file, 'r', encoding='utf-8') as f:
-                                first_line = f.readline().strip()
-                                if first_line.startswith('#'):
-                                    first_line = first_line.lstrip('#').strip()
-                                if first_line:
-                                    print(f"    📖 说明: {first_line}")
-                        except Exception:
-                            pass
-                    
-                    # 显示文件统计
-                    try:
-                        file_count = len(list(mode_dir.rglob('*')))
-                        print(f"    📁 文件数: {file_count}")
-                    except Exception:
-                        print("    📁 文件数: 未知")
-                    print()
+                    lines.extend(next(details))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
         
         if template_count == 0:
             self.logger.warning("未找到可用模板")
@@ -181,14 +305,48 @@ class AceFlowTemplateManager:
         
         return True
     
+    def _template_details(self, mode_dir: Path) -> List[str]:
+        """生成模板列表中单个模板的详细信息行 (描述、说明及文件数)"""
+        lines = []
+        template_file = mode_dir / "template.yaml"
+        readme_file = mode_dir / "README.md"
+        
+        if template_file.exists():
+            try:
+                # 空文件解析为 None，按无描述处理
+                template_data = self._load_template_yaml(template_file) or {}
+                description = (template_data.get('project') or {}).get('description', '无描述')
+                lines.append(f"    📝 描述: {description}")
+            except Exception:
+                lines.append("    📝 描述: 读取失败")
+        
+        if readme_file.exists():
+            try:
+                with open(readme_file, 'r', encoding='utf-8') as f:
+                    first_line = f.read(256).split('\n', 1)[0].strip()
+                    if first_line.startswith('#'):
+                        first_line = first_line.lstrip('#').strip()
+                    if first_line:
+                        lines.append(f"    📖 说明: {first_line}")
+            except Exception:
+                pass
+        
+        # 显示文件统计
+        try:
+            file_count = sum(1 for _ in self._scan_tree(mode_dir))
+            lines.append(f"    📁 文件数: {file_count}")
+        except Exception:
+            lines.append("    📁 文件数: 未知")
+        lines.append('')
+        return lines
+    
     def show_template_info(self, mode: str, verbose: bool = False) -> bool:
         """显示模板详细信息"""
-        if not self.validate_mode(mode):
+        mode_dir = self.validate_mode(mode)
+        if mode_dir is None:
             self.logger.error(f"模板不存在: {mode}")
             return False
         
-        template_dir = self.get_template_dir()
-        mode_dir = template_dir / mode
         template_file = mode_dir / "template.yaml"
         readme_file = mode_dir / "README.md"
         
@@ -202,8 +360,7 @@ class AceFlowTemplateManager:
             print("─────────────────────────────")
             
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    template_data = yaml.safe_load(f)
+                template_data = self._load_template_yaml(template_file)
                 
                 # 提取关键信息
                 project_info = template_data.get('project', {})
@@ -226,20 +383,23 @@ class AceFlowTemplateManager:
             print("─────────────────────────────")
             
             try:
-                with open(readme_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
+                raw = readme_file.read_bytes()
                 
                 if verbose:
                     # 显示完整README
-                    print(''.join(lines))
+                    print(raw.decode('utf-8'))
                 else:
-                    # 显示前10行
-                    display_lines = lines[:10]
-                    print(''.join(display_lines))
+                    # 显示前10行，仅切分出需要的部分
+                    head = raw.split(b'\n', 10)
+                    if len(head) > 10:
+                        print((b'\n'.join(head[:10]) + b'\n').decode('utf-8'))
+                    else:
+                        print(raw.decode('utf-8'))
                     
-                    if len(lines) > 10:
+                    line_count = raw.count(b'\n') + (0 if raw.endswith(b'\n') else 1)
+                    if line_count > 10:
                         print()
-                        print(f"{Colors.GRAY}... (还有 {len(lines) - 10} 行，使用 --verbose 查看完整内容){Colors.NC}")
+                        print(f"{Colors.GRAY}... (还有 {line_count - 10} 行，使用 --verbose 查看完整内容){Colors.NC}")
                 print()
                 
             except Exception as e:
@@ -251,24 +411,20 @@ class AceFlowTemplateManager:
         print("─────────────────────────────")
         
         try:
-            # 尝试使用tree命令
-            result = subprocess.run(
-                ["tree", str(mode_dir), "-I", "__pycache__|*.pyc"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                print(result.stdout)
-            else:
-                raise subprocess.CalledProcessError(result.returncode, "tree")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # 使用简单的文件列表
-            try:
-                files = sorted([str(p.relative_to(mode_dir)) for p in mode_dir.rglob('*') if p.is_file()])
-                for file_path in files:
-                    print(f"  {file_path}")
-            except Exception as e:
-                print(f"无法列出文件: {e}")
+            # 在进程内按目录层级缩进显示，无需调用外部 tree 命令
+            shown_dirs = set()
+            for file_path in sorted(self._iter_rel_files(mode_dir)):
+                parts = file_path.split(os.sep)
+                if '__pycache__' in parts or file_path.endswith('.pyc'):
+                    continue
+                for depth, name in enumerate(parts[:-1]):
+                    dir_path = os.sep.join(parts[:depth + 1])
+                    if dir_path not in shown_dirs:
+                        shown_dirs.add(dir_path)
+                        print(f"  {'  ' * depth}{name}/")
+                print(f"  {'  ' * (len(parts) - 1)}{parts[-1]}")
+        except Exception as e:
+            print(f"无法列出文件: {e}")
         
         print()
         
@@ -277,23 +433,33 @@ class AceFlowTemplateManager:
         print("─────────────────────────────")
         
         try:
-            all_files = list(mode_dir.rglob('*'))
-            file_count = len([f for f in all_files if f.is_file()])
-            yaml_count = len([f for f in all_files if f.is_file() and f.suffix in ['.yaml', '.yml']])
-            md_count = len([f for f in all_files if f.is_file() and f.suffix == '.md'])
+            # 单次遍历同时统计文件数、各扩展名数量及最后修改时间
+            suffix_counts = Counter()
+            file_count = 0
+            latest_mtime = None
+            mtime_error = False
+            for entry in self._scan_tree(mode_dir):
+                if not entry.is_file():
+                    continue
+                file_count += 1
+                suffix_counts[os.path.splitext(entry.name)[1]] += 1
+                try:
+                    mtime = entry.stat().st_mtime
+                    if latest_mtime is None or mtime > latest_mtime:
+                        latest_mtime = mtime
+                except OSError:
+                    mtime_error = True
             
             print(f"总文件数: {file_count}")
-            print(f"YAML配置: {yaml_count}")
-            print(f"Markdown文档: {md_count}")
+            print(f"YAML配置: {suffix_counts['.yaml'] + suffix_counts['.yml']}")
+            print(f"Markdown文档: {suffix_counts['.md']}")
             
             # 最后修改时间
-            try:
-                mtimes = [f.stat().st_mtime for f in all_files if f.is_file()]
-                if mtimes:
-                    last_modified = datetime.fromtimestamp(max(mtimes)).strftime("%Y-%m-%d %H:%M:%S")
-                    print(f"最后修改: {last_modified}")
-            except Exception:
+            if mtime_error:
                 print("最后修改: 未知")
+            elif latest_mtime is not None:
+                last_modified = datetime.fromtimestamp(latest_mtime).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"最后修改: {last_modified}")
                 
         except Exception as e:
             print(f"统计信息获取失败: {e}")
@@ -302,7 +468,8 @@ class AceFlowTemplateManager:
     
     def switch_mode(self, target_mode: str, force: bool = False, verbose: bool = False) -> bool:
         """切换项目模式"""
-        if not self.validate_mode(target_mode):
+        source_template_dir = self.validate_mode(target_mode)
+        if source_template_dir is None:
             self.logger.error(f"模板不存在: {target_mode}")
             return False
         
@@ -326,30 +493,42 @@ class AceFlowTemplateManager:
                 self.logger.info("操作已取消")
                 return True
         
+        aceflow_config_dir = self.project_dir / ".aceflow"
+        staging_dir = self.project_dir / ".aceflow.new"
+        old_dir = self.project_dir / ".aceflow.old"
+        
+        # 处理上次中断的切换留下的目录: 若 .aceflow 缺失而 .aceflow.old 存在，
+        # 后者是唯一的配置副本，需先恢复而不能删除
+        if old_dir.exists():
+            if aceflow_config_dir.exists():
+                shutil.rmtree(old_dir)
+            else:
+                os.replace(old_dir, aceflow_config_dir)
+                self.logger.warning("检测到上次未完成的模式切换，已从 .aceflow.old 恢复配置目录")
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        
         self.logger.info("备份当前配置...")
         self.backup_current_config()
         
         self.logger.info("应用新模板...")
-        template_dir = self.get_template_dir()
         
-        # 清理并重新创建配置目录
-        aceflow_config_dir = self.project_dir / ".aceflow"
-        if aceflow_config_dir.exists():
-            shutil.rmtree(aceflow_config_dir)
-        aceflow_config_dir.mkdir(parents=True, exist_ok=True)
+        # 先将新模板复制到临时目录，完成后再通过重命名替换配置目录，
+        # 复制失败时原配置保持不变
         
-        # 复制新模板
-        source_template_dir = template_dir / target_mode
         try:
-            for item in source_template_dir.iterdir():
-                if item.is_file():
-                    shutil.copy2(item, aceflow_config_dir)
-                elif item.is_dir():
-                    shutil.copytree(item, aceflow_config_dir / item.name)
+            self._copy_tree(source_template_dir, staging_dir)
         except Exception as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
             self.logger.error(f"复制模板失败: {e}")
             return False
         
+        if aceflow_config_dir.exists():
+            os.replace(aceflow_config_dir, old_dir)
+        os.replace(staging_dir, aceflow_config_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        
         # 更新项目状态
         self.update_project_mode(target_mode)
         
@@ -363,54 +542,106 @@ class AceFlowTemplateManager:
         
         return True
     
+    def _config_fingerprint(self, items: List[Path]) -> str:
+        """根据备份项的路径、修改时间和大小计算配置指纹 (不读取文件内容)"""
+        import hashlib  # 延迟导入，仅备份时需要
+        
+        digest = hashlib.blake2b(digest_size=16)
+        root_len = len(os.path.join(str(self.project_dir), ''))
+        for path in items:
+            st = path.stat()
+            digest.update(f"{str(path)[root_len:]}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8'))
+            if path.is_dir():
+                for entry in sorted(self._scan_tree(path), key=lambda entry: entry.path):
+                    st = entry.stat()
+                    digest.update(f"{entry.path[root_len:]}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8'))
+        return digest.hexdigest()
+    
     def backup_current_config(self) -> bool:
-        """备份当前配置"""
+        """备份当前配置 (配置目录、状态文件及.clinerules打包为单个归档)"""
+        import tarfile  # 延迟导入，仅备份/恢复时需要
+        
         backup_dir = self.project_dir / "aceflow_result" / "backups"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_name = f"config_backup_{timestamp}"
         
         backup_dir.mkdir(parents=True, exist_ok=True)
         
+        # 归档内保留相对于项目目录的路径
+        items = [path for path in (self.project_dir / arcname for arcname in self.BACKUP_ITEMS)
+                 if path.exists()]
+        if not items:
+            return True
+        
+        # 配置自上次备份后未变化且该备份仍存在时跳过
+        hash_file = backup_dir / self.BACKUP_HASH_FILE
         try:
-            # 备份配置目录
-            aceflow_config_dir = self.project_dir / ".aceflow"
-            if aceflow_config_dir.exists():
-                backup_config_dir = backup_dir / backup_name
-                shutil.copytree(aceflow_config_dir, backup_config_dir)
-                self.logger.success(f"配置已备份到: {backup_config_dir}")
-            
-            # 备份状态文件
-            state_file = self.project_dir / "aceflow_result" / "current_state.json"
-            if state_file.exists():
-                backup_state_file = backup_dir / f"{backup_name}_state.json"
-                shutil.copy2(state_file, backup_state_file)
-            
-            # 备份.clinerules
-            clinerules_file = self.project_dir / ".clinerules"
-            if clinerules_file.exists():
-                backup_clinerules_file = backup_dir / f"{backup_name}_clinerules"
-                shutil.copy2(clinerules_file, backup_clinerules_file)
+            fingerprint = self._config_fingerprint(items)
+        except OSError:
+            fingerprint = None
+        if fingerprint is not None:
+            try:
+                last_hash, last_backup = hash_file.read_text(encoding='utf-8').split()
+            except (OSError, ValueError):
+                last_hash = last_backup = None
+            if last_hash == fingerprint and (backup_dir / last_backup).is_file():
+                self.logger.info(f"配置未变化，跳过备份 (最近备份: {backup_dir / last_backup})")
+                return True
+        
+        backup_file = backup_dir / f"{backup_name}{self.BACKUP_SUFFIX}"
+        created = False
+        try:
+            # dereference: 与旧版 copytree 一致，跟随符号链接存入目标内容，
+            # 恢复时只接受普通文件和目录
+            with tarfile.open(backup_file, "x:gz", dereference=True) as tar:
+                created = True
+                for path in items:
+                    tar.add(path, arcname=path.relative_to(self.project_dir).as_posix())
             
+            if fingerprint is not None:
+                hash_file.write_text(f"{fingerprint} {backup_file.name}\n", encoding='utf-8')
+            self.logger.success(f"配置已备份到: {backup_file}")
             return True
             
         except Exception as e:
+            if created:
+                backup_file.unlink(missing_ok=True)
             self.logger.error(f"备份失败: {e}")
             return False
     
+    def list_backups(self) -> List[str]:
+        """列出可用备份名称 (包括旧版目录形式的备份)"""
+        backup_dir = self.project_dir / "aceflow_result" / "backups"
+        backups = set()
+        with os.scandir(backup_dir) as it:
+            for entry in it:
+                if not entry.name.startswith("config_backup_"):
+                    continue
+                if entry.name.endswith(self.BACKUP_SUFFIX) and entry.is_file():
+                    backups.add(entry.name[:-len(self.BACKUP_SUFFIX)])
+                elif entry.is_dir():
+                    backups.add(entry.name)
+        return sorted(backups)
+    
     def restore_from_backup(self, backup_name: str, force: bool = False) -> bool:
         """从备份恢复配置"""
+        import tarfile  # 延迟导入，仅备份/恢复时需要
+        
+        if backup_name.endswith(self.BACKUP_SUFFIX):
+            backup_name = backup_name[:-len(self.BACKUP_SUFFIX)]
+        
         backup_dir = self.project_dir / "aceflow_result" / "backups"
+        backup_file = backup_dir / f"{backup_name}{self.BACKUP_SUFFIX}"
         backup_path = backup_dir / backup_name
         
-        if not backup_path.exists():
+        if not backup_file.is_file() and not backup_path.is_dir():
             self.logger.error(f"备份不存在: {backup_name}")
             self.logger.info("可用备份:")
             
             try:
-                backups = [d.name for d in backup_dir.iterdir() 
-                          if d.is_dir() and d.name.startswith("config_backup_")]
+                backups = self.list_backups()
                 if backups:
-                    for backup in sorted(backups):
+                    for backup in backups:
                         print(f"  {backup}")
                 else:
                     print("  (无备份)")
@@ -427,23 +658,40 @@ class AceFlowTemplateManager:
                 return True
         
         try:
-            # 恢复配置目录
             aceflow_config_dir = self.project_dir / ".aceflow"
-            if aceflow_config_dir.exists():
-                shutil.rmtree(aceflow_config_dir)
-            shutil.copytree(backup_path, aceflow_config_dir)
-            
-            # 恢复状态文件
-            backup_state_file = backup_dir / f"{backup_name}_state.json"
-            if backup_state_file.exists():
-                state_file = self.project_dir / "aceflow_result" / "current_state.json"
-                shutil.copy2(backup_state_file, state_file)
             
-            # 恢复.clinerules
-            backup_clinerules_file = backup_dir / f"{backup_name}_clinerules"
-            if backup_clinerules_file.exists():
-                clinerules_file = self.project_dir / ".clinerules"
-                shutil.copy2(backup_clinerules_file, clinerules_file)
+            if backup_file.is_file():
+                with tarfile.open(backup_file, "r:gz") as tar:
+                    # 仅允许恢复备份范围内的文件
+                    for member in tar.getmembers():
+                        name = member.name
+                        if not (name in self.BACKUP_ITEMS or name.startswith(".aceflow/")) \
+                                or ".." in name.split("/") or not (member.isfile() or member.isdir()):
+                            raise ValueError(f"备份归档包含非法条目: {name}")
+                    
+                    if aceflow_config_dir.exists():
+                        shutil.rmtree(aceflow_config_dir)
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(self.project_dir, filter="data")
+                    else:
+                        tar.extractall(self.project_dir)
+            else:
+                # 旧版目录形式的备份
+                if aceflow_config_dir.exists():
+                    shutil.rmtree(aceflow_config_dir)
+                self._copy_tree(backup_path, aceflow_config_dir)
+                
+                # 恢复状态文件
+                backup_state_file = backup_dir / f"{backup_name}_state.json"
+                if backup_state_file.exists():
+                    state_file = self.project_dir / "aceflow_result" / "current_state.json"
+                    shutil.copy2(backup_state_file, state_file)
+                
+                # 恢复.clinerules
+                backup_clinerules_file = backup_dir / f"{backup_name}_clinerules"
+                if backup_clinerules_file.exists():
+                    clinerules_file = self.project_dir / ".clinerules"
+                    shutil.copy2(backup_clinerules_file, clinerules_file)
             
             self.logger.success(f"配置已从备份恢复: {backup_name}")
             return True
@@ -454,12 +702,13 @@ class AceFlowTemplateManager:
     
     def validate_template(self, mode: str) -> bool:
         """验证模板配置"""
-        if not self.validate_mode(mode):
+        import yaml  # 延迟导入，仅解析模板配置的命令需要
+        
+        mode_dir = self.validate_mode(mode)
+        if mode_dir is None:
             self.logger.error(f"模板不存在: {mode}")
             return False
         
-        template_dir = self.get_template_dir()
-        mode_dir = template_dir / mode
         template_file = mode_dir / "template.yaml"
         readme_file = mode_dir / "README.md"
         
@@ -468,14 +717,30 @@ class AceFlowTemplateManager:
         print(f"{Colors.CYAN}验证模板: {mode}{Colors.NC}")
         print("─────────────────────────────")
         
+        # 模板配置只读取一次，格式、字段及模式特定检查共用同一份内容;
+        # 直接读取文件，以 FileNotFoundError 代替单独的 exists() 检查
+        raw = None
+        read_error = None
+        try:
+            raw = template_file.read_bytes()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            read_error = e
+        
         # 检查必需文件
-        if template_file.exists():
+        if raw is not None or read_error is not None:
             self.logger.success("模板配置文件存在")
             
             # 验证YAML格式
+            yaml_valid = False
+            template_data = None
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    yaml.safe_load(f)
+                if read_error is not None:
+                    raise read_error
+                loader, _ = self._yaml_safe_classes()
+                template_data = yaml.load(raw, Loader=loader)
+                yaml_valid = True
                 self.logger.success("YAML格式正确")
             except yaml.YAMLError:
                 self.logger.error("YAML格式错误")
@@ -484,10 +749,10 @@ class AceFlowTemplateManager:
                 self.logger.error(f"YAML读取失败: {e}")
                 validation_errors += 1
             
-            # 检查必需字段
+            # 检查必需字段 (复用上面的解析结果)
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    template_data = yaml.safe_load(f)
+                if not yaml_valid:
+                    raise ValueError("模板配置解析失败")
                 
                 required_fields = ["project", "flow"]
                 for field in required_fields:
@@ -509,38 +774,23 @@ class AceFlowTemplateManager:
         else:
             self.logger.warning("README文档不存在")
         
-        # 验证模式特定要求
-        if mode == "complete":
-            try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                stage_files = ["s1_user_story", "s2_tasks_group", "s3_testcases", 
-                              "s4_implementation", "s5_test_report", "s6_codereview", 
-                              "s7_demo_script", "s8_summary_report"]
-                
-                for stage in stage_files:
-                    if stage in content:
-                        self.logger.success(f"包含完整模式阶段: {stage}")
-                    else:
-                        self.logger.warning(f"完整模式可能缺少阶段: {stage}")
-                        
-            except Exception:
-                pass
-                
-        elif mode == "smart":
-            try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if "smart_features" in content:
-                    self.logger.success("包含智能特性配置")
+        # 验证模式特定要求 (直接在已读取的字节内容中查找)
+        if mode == "complete" and raw is not None:
+            # 一次正则扫描找出所有出现的阶段名称
+            found = {m.group().decode() for m in self.COMPLETE_STAGE_RE.finditer(raw)}
+            
+            for stage in self.COMPLETE_STAGES:
+                if stage in found:
+                    self.logger.success(f"包含完整模式阶段: {stage}")
                 else:
-                    self.logger.error("智能模式缺少智能特性配置")
-                    validation_errors += 1
-                    
-            except Exception:
-                pass
+                    self.logger.warning(f"完整模式可能缺少阶段: {stage}")
+                
+        elif mode == "smart" and raw is not None:
+            if b"smart_features" in raw:
+                self.logger.success("包含智能特性配置")
+            else:
+                self.logger.error("智能模式缺少智能特性配置")
+                validation_errors += 1
         
         print()
         if validation_errors == 0:
@@ -552,7 +802,8 @@ class AceFlowTemplateManager:
     
     def customize_template(self, mode: str) -> bool:
         """自定义模板配置"""
-        if not self.validate_mode(mode):
+        source_template_dir = self.validate_mode(mode)
+        if source_template_dir is None:
             self.logger.error(f"模板不存在: {mode}")
             return False
         
@@ -564,15 +815,8 @@ class AceFlowTemplateManager:
         custom_dir.mkdir(parents=True, exist_ok=True)
         
         # 复制原始模板
-        template_dir = self.get_template_dir()
-        source_template_dir = template_dir / mode
-        
         try:
-            for item in source_template_dir.iterdir():
-                if item.is_file():
-                    shutil.copy2(item, custom_dir)
-                elif item.is_dir():
-                    shutil.copytree(item, custom_dir / item.name, dirs_exist_ok=True)
+            self._copy_tree(source_template_dir, custom_dir, dirs_exist_ok=True)
         except Exception as e:
             self.logger.error(f"复制模板失败: {e}")
             return False
@@ -624,6 +868,8 @@ class AceFlowTemplateManager:
     
     def customize_project_info(self, custom_dir: Path) -> bool:
         """自定义项目信息"""
+        import yaml  # 延迟导入，仅解析模板配置的命令需要
+        
         template_file = custom_dir / "template.yaml"
         
         print("自定义项目信息:")
@@ -635,8 +881,9 @@ class AceFlowTemplateManager:
             duration = input("预估时长: ").strip()
             
             # 读取现有配置
-            with open(template_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+            loader, dumper = self._yaml_safe_classes()
+            with open(template_file, 'rb') as f:
+                data = yaml.load(f, Loader=loader) or {}
             
             if 'project' not in data:
                 data['project'] = {}
@@ -653,7 +900,7 @@ class AceFlowTemplateManager:
             
             # 写回文件
             with open(template_file, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+                yaml.dump(data, f, Dumper=dumper, default_flow_style=False, allow_unicode=True)
             
             print("项目信息已更新")
             return True
@@ -664,12 +911,12 @@ class AceFlowTemplateManager:
     
     def export_template(self, mode: str, output_file: str) -> bool:
         """导出模板配置"""
-        if not self.validate_mode(mode):
+        mode_dir = self.validate_mode(mode)
+        if mode_dir is None:
             self.logger.error(f"模板不存在: {mode}")
             return False
         
-        template_dir = self.get_template_dir()
-        template_file = template_dir / mode / "template.yaml"
+        template_file = mode_dir / "template.yaml"
         
         if not template_file.exists():
             self.logger.error("模板配置文件不存在")
@@ -686,6 +933,8 @@ class AceFlowTemplateManager:
     
     def import_template(self, import_file: str, force: bool = False) -> bool:
         """导入模板配置"""
+        import yaml  # 延迟导入，仅解析模板配置的命令需要
+        
         import_path = Path(import_file)
         if not import_path.exists():
             self.logger.error(f"导入文件不存在: {import_file}")
@@ -693,8 +942,7 @@ class AceFlowTemplateManager:
         
         # 验证导入文件格式
         try:
-            with open(import_path, 'r', encoding='utf-8') as f:
-                yaml.safe_load(f)
+            self._load_template_yaml(import_path)
         except yaml.YAMLError:
             self.logger.error("导入文件格式错误")
             return False
@@ -721,8 +969,7 @@ class AceFlowTemplateManager:
             shutil.copy2(import_path, template_target)
             
             # 确定导入的模式
-            with open(import_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = self._load_template_yaml(import_path)
             imported_mode = data.get('flow', {}).get('mode', 'standard')
             
             # 更新项目状态
@@ -744,8 +991,7 @@ class AceFlowTemplateManager:
             return False
         
         try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._json_loads(state_file.read_bytes())
             
             data['project']['mode'] = new_mode
             data['project']['last_updated'] = datetime.now().isoformat()
@@ -753,8 +999,7 @@ class AceFlowTemplateManager:
             data['flow']['completed_stages'] = []
             data['flow']['progress_percentage'] = 0
             
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._write_bytes_atomic(state_file, self._json_dumps(data))
             
             return True
             
@@ -790,11 +1035,31 @@ AceFlow模式: {mode}
         
         try:
             clinerules_file = self.project_dir / ".clinerules"
-            clinerules_file.write_text(clinerules_content, encoding='utf-8')
+            self._write_bytes_atomic(clinerules_file, clinerules_content.encode('utf-8'))
             return True
         except Exception as e:
             self.logger.error(f"生成.clinerules失败: {e}")
             return False
+    
+    # 命令分派表: 命令名 -> (处理函数, 必需的参数, 参数缺失时的错误提示)
+    COMMANDS = {
+        "list": (lambda self, args: self.list_templates(args.verbose), (), None),
+        "info": (lambda self, args: self.show_template_info(args.mode_or_file, args.verbose),
+                 ("mode_or_file",), "请指定模式名称"),
+        "switch": (lambda self, args: self.switch_mode(args.mode_or_file, args.force, args.verbose),
+                   ("mode_or_file",), "请指定目标模式"),
+        "backup": (lambda self, args: self.backup_current_config(), (), None),
+        "restore": (lambda self, args: self.restore_from_backup(args.mode_or_file, args.force),
+                    ("mode_or_file",), "请指定备份名称"),
+        "validate": (lambda self, args: self.validate_template(args.mode_or_file),
+                     ("mode_or_file",), "请指定模式名称"),
+        "customize": (lambda self, args: self.customize_template(args.mode_or_file),
+                      ("mode_or_file",), "请指定模式名称"),
+        "export": (lambda self, args: self.export_template(args.mode_or_file, args.output_file),
+                   ("mode_or_file", "output_file"), "请指定模式名称和输出文件"),
+        "import": (lambda self, args: self.import_template(args.mode_or_file, args.force),
+                   ("mode_or_file",), "请指定导入文件"),
+    }
 
 
 def main():
@@ -830,7 +1095,7 @@ def main():
     
     parser.add_argument(
         "command",
-        choices=["list", "info", "switch", "backup", "restore", "validate", "customize", "export", "import"],
+        choices=list(AceFlowTemplateManager.COMMANDS),
         help="要执行的命令"
     )
     parser.add_argument(
@@ -876,77 +1141,26 @@ def main():
         print(f"{Colors.RED}[ERROR]{Colors.NC} 项目目录不存在: {project_dir}")
         sys.exit(1)
     
+    # 文件参数相对于项目目录解析，所有路径均为绝对路径，无需切换工作目录
+    if args.command == "import" and args.mode_or_file:
+        args.mode_or_file = str(project_dir / args.mode_or_file)
+    elif args.command == "export" and args.output_file:
+        args.output_file = str(project_dir / args.output_file)
+    
     # 创建模板管理器
     manager = AceFlowTemplateManager(str(project_dir))
     
     try:
-        # 切换到项目目录
-        original_cwd = Path.cwd()
-        os.chdir(project_dir)
-        
         # 显示标题
         manager.logger.header()
         
-        success = True
-        
         # 执行对应命令
-        if args.command == "list":
-            success = manager.list_templates(args.verbose)
-            
-        elif args.command == "info":
-            if not args.mode_or_file:
-                manager.logger.error("请指定模式名称")
-                success = False
-            else:
-                success = manager.show_template_info(args.mode_or_file, args.verbose)
-                
-        elif args.command == "switch":
-            if not args.mode_or_file:
-                manager.logger.error("请指定目标模式")
-                success = False
-            else:
-                success = manager.switch_mode(args.mode_or_file, args.force, args.verbose)
-                
-        elif args.command == "backup":
-            success = manager.backup_current_config()
-            
-        elif args.command == "restore":
-            if not args.mode_or_file:
-                manager.logger.error("请指定备份名称")
-                success = False
-            else:
-                success = manager.restore_from_backup(args.mode_or_file, args.force)
-                
-        elif args.command == "validate":
-            if not args.mode_or_file:
-                manager.logger.error("请指定模式名称")
-                success = False
-            else:
-                success = manager.validate_template(args.mode_or_file)
-                
-        elif args.command == "customize":
-            if not args.mode_or_file:
-                manager.logger.error("请指定模式名称")
-                success = False
-            else:
-                success = manager.customize_template(args.mode_or_file)
-                
-        elif args.command == "export":
-            if not args.mode_or_file or not args.output_file:
-                manager.logger.error("请指定模式名称和输出文件")
-                success = False
-            else:
-                success = manager.export_template(args.mode_or_file, args.output_file)
-                
-        elif args.command == "import":
-            if not args.mode_or_file:
-                manager.logger.error("请指定导入文件")
-                success = False
-            else:
-                success = manager.import_template(args.mode_or_file, args.force)
-        
-        # 恢复原始工作目录
-        os.chdir(original_cwd)
+        handler, required_args, missing_message = manager.COMMANDS[args.command]
+        if all(getattr(args, name) for name in required_args):
+            success = handler(manager, args)
+        else:
+            manager.logger.error(missing_message)
+            success = False
         
         # 设置退出码
         sys.exit(0 if success else 1)
@@ -6,59 +6,353 @@ AceFlow v2.0 第1阶段验收测试脚本
 
 import os
 import sys
+import io
 import json
 import yaml
-import subprocess
+import threading
+import importlib.machinery
+import importlib.util
+import pickle
+import py_compile
+import re
+from contextlib import redirect_stderr, redirect_stdout
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选加速依赖，缺失时回退到标准库 json
+    orjson = None
+
+# 优先使用 LibYAML 的 C 实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# 中日韩统一表意文字 (用于检查文档是否包含中文)
+_CJK_RE = re.compile('[\u4e00-\u9fff]')
+
+# Web 界面与快速启动向导需要包含的关键内容，各用一次扫描查找
+# (各标记互不重叠，finditer 不会因为前一个匹配而漏掉后一个)
+_HTML_MARKERS = re.compile("|".join(map(re.escape, (
+    "AceFlow", "<style>", "<script>", "flow-modes", "stages-container", "@media",
+))))
+_WIZARD_MARKERS = re.compile("|".join(map(re.escape, (
+    "class AceFlowWizard", "def main(", "select_template", "configure_project",
+))))
+
+# YAML 解析结果的持久缓存，键为 (绝对路径, mtime_ns, 文件大小)
+YAML_CACHE_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "aceflow" / "yaml_cache.pickle"
+)
+
 class AceFlowAcceptanceTest:
+    # 测试组的执行 (及输出) 顺序
+    TEST_ORDER = (
+        "test_directory_structure",
+        "test_core_files",
+        "test_file_permissions",
+        "test_config_files",
+        "test_cli_commands",
+        "test_flow_modes",
+        "test_templates",
+        "test_web_interface",
+        "test_agile_integration",
+        "test_wizard_functionality",
+        "test_documentation_quality",
+        "test_integration_complete",
+    )
+    # 会修改项目状态文件的测试组，在主线程中按顺序执行
+    SERIAL_TESTS = frozenset({"test_cli_commands", "test_integration_complete"})
+    # 验收结果评估: (成功率下限, 结论)，按下限从高到低排列
+    VERDICTS = (
+        (90, "   🎉 验收通过 - 第1阶段开发目标已达成\n"
+             "   ✨ 系统功能完整，质量良好，可以进入第2阶段"),
+        (80, "   ⚠️  有条件通过 - 存在少量问题需要修复\n"
+             "   🔧 建议修复失败项后再进入下一阶段"),
+        (0, "   ❌ 验收未通过 - 存在重大问题需要解决\n"
+            "   🛠️  需要重点修复失败项目"),
+    )
+    # 测试开始前统一解析的配置文件
+    CONFIG_FILES = (
+        ".aceflow/config.yaml",
+        ".aceflow/state/project_state.json",
+        ".aceflow/config/flow_modes.yaml",
+        ".aceflow/config/agile_integration.yaml",
+        ".aceflow/templates/minimal/template.yaml",
+    )
+    # 测试开始前批量预读的文件
+    PREFETCH_FILES = (
+        ".aceflow/config.yaml",
+        ".aceflow/state/project_state.json",
+        ".aceflow/config/flow_modes.yaml",
+        ".aceflow/config/agile_integration.yaml",
+        ".aceflow/templates/minimal/template.yaml",
+        ".aceflow/templates/minimal/requirements.md",
+        ".aceflow/templates/minimal/tasks.md",
+        ".aceflow/web/index.html",
+        ".aceflow/scripts/wizard.py",
+        "AceFlow_Optimization_Plan.md",
+        "AceFlow_Migration_Guide.md",
+        "AceFlow_Quick_Start_Guide.md",
+    )
+    
     def __init__(self):
         self.project_root = Path.cwd()
         self.aceflow_dir = self.project_root / ".aceflow"
         self.test_results = []
         self.total_tests = 0
         self.passed_tests = 0
+        # 并行执行的测试组先将输出记录在线程本地列表中，再由主线程按顺序回放
+        self._local = threading.local()
+        self._cli_module = None
+        # 项目文件快照: 目录以 "/" 结尾的相对路径集合，由 _snapshot() 生成
+        self._present = set()
+        # 文件内容缓存: 相对路径 -> (mtime_ns, 文件大小, bytes)
+        self._file_bytes = {}
+        # 本次运行用到的 YAML 解析结果，结束时写回持久缓存
+        self._yaml_cache = None
+        self._yaml_used = {}
+        # 配置文件解析结果: 相对路径 -> 数据 (解析失败时为异常对象)
+        self._parsed = {}
         
     def log_test(self, test_name, passed, message=""):
         """记录测试结果"""
-        self.total_tests += 1
-        if passed:
-            self.passed_tests += 1
-            status = "✅ PASS"
-        else:
-            status = "❌ FAIL"
+        status = "✅ PASS" if passed else "❌ FAIL"
         
         result = f"{status} {test_name}"
         if message:
             result += f" - {message}"
         
-        self.test_results.append(result)
-        print(result)
+        records = getattr(self._local, "records", None)
+        if records is not None:
+            records.append((result, bool(passed)))
+        else:
+            self._record_result(result, passed)
+            print(result)
         return passed
     
-    def run_command(self, command, expect_success=True):
-        """运行命令并返回结果"""
+    def _record_result(self, result, passed):
+        """累计测试结果"""
+        self.total_tests += 1
+        if passed:
+            self.passed_tests += 1
+        self.test_results.append(result)
+    
+    def log_section(self, title):
+        """输出测试组标题"""
+        records = getattr(self._local, "records", None)
+        if records is not None:
+            records.append((title, None))
+        else:
+            print(title)
+    
+    def _run_buffered(self, test_name):
+        """执行测试组并返回记录的输出 (期间不直接写标准输出)"""
+        self._local.records = []
         try:
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                capture_output=True, 
-                text=True,
-                cwd=self.project_root
-            )
-            
-            if expect_success:
-                return result.returncode == 0, result.stdout, result.stderr
-            else:
-                return result.returncode != 0, result.stdout, result.stderr
+            getattr(self, test_name)()
+            return self._local.records
+        finally:
+            self._local.records = None
+    
+    def _replay(self, records):
+        """累计测试组的结果，并一次性输出其全部记录"""
+        if not records:
+            return
+        for text, passed in records:
+            if passed is not None:
+                self._record_result(text, passed)
+        sys.stdout.write("\n".join(text for text, _ in records) + "\n")
+    
+    def _load_cli(self):
+        """加载 .aceflow/scripts/aceflow 命令行模块 (仅加载一次)"""
+        if self._cli_module is None:
+            cli_file = self.aceflow_dir / "scripts" / "aceflow"
+            loader = importlib.machinery.SourceFileLoader("aceflow_cli", str(cli_file))
+            spec = importlib.util.spec_from_loader("aceflow_cli", loader)
+            module = importlib.util.module_from_spec(spec)
+            loader.exec_module(module)
+            self._cli_module = module
+        return self._cli_module
+    
+    def run_cli(self, *args):
+        """在当前进程中运行 aceflow 命令并返回结果"""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        saved_argv = sys.argv
+        returncode = 0
+        try:
+            cli = self._load_cli()
+            sys.argv = ["aceflow", *args]
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                cli.main()
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                returncode = e.code
+            elif e.code is not None:
+                stderr.write(f"{e.code}\n")
+                returncode = 1
         except Exception as e:
-            return False, "", str(e)
+            stderr.write(f"{e}\n")
+            returncode = 1
+        finally:
+            sys.argv = saved_argv
+        return returncode == 0, stdout.getvalue(), stderr.getvalue()
+    
+    def _snapshot(self):
+        """扫描一次项目文件，记录存在的目录和文件
+        
+        递归扫描 .aceflow (跟随目录符号链接，跳过指向自身上级目录的链接以避免循环)，
+        另外列出项目根目录和 .clinerules，存在性检查只需查询集合而不必逐个 stat。
+        """
+        present = set()
+        
+        def scan(rel_dir, recursive):
+            root = os.path.realpath(self.project_root / rel_dir)
+            # (相对路径, 真实路径, 上级目录的真实路径集合)
+            stack = [(rel_dir, root, frozenset((root,)))]
+            while stack:
+                current, real_dir, ancestors = stack.pop()
+                try:
+                    with os.scandir(self.project_root / current) as entries:
+                        for entry in entries:
+                            rel = f"{current}/{entry.name}" if current else entry.name
+                            if entry.is_dir():
+                                present.add(rel + "/")
+                                if not recursive:
+                                    continue
+                                if entry.is_symlink():
+                                    real = os.path.realpath(entry.path)
+                                else:
+                                    real = os.path.join(real_dir, entry.name)
+                                if real not in ancestors:
+                                    stack.append((rel, real, ancestors | {real}))
+                            else:
+                                present.add(rel)
+                except OSError:
+                    continue
+        
+        scan("", False)
+        scan(".aceflow", True)
+        scan(".clinerules", False)
+        self._present = present
+    
+    @staticmethod
+    def _json_loads(data):
+        """解析JSON (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    @staticmethod
+    def _json_dumps(obj):
+        """序列化为缩进格式、以换行结尾的UTF-8 JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.dumps(
+                obj,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+            )
+        return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode('utf-8')
+    
+    def _read_entry(self, rel_path):
+        """读取文件，返回 (mtime_ns, 文件大小, bytes)"""
+        with open(self.project_root / rel_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            return st.st_mtime_ns, st.st_size, f.read()
+    
+    def _batch_read(self, paths):
+        """并发读取一批文件到内容缓存 (读取失败的文件留待使用时再报告)"""
+        def read(rel):
+            try:
+                return self._read_entry(rel)
+            except OSError:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for rel, entry in zip(paths, pool.map(read, paths)):
+                if entry is not None:
+                    self._file_bytes[rel] = entry
+    
+    def _slurp(self, rel_path):
+        """读取文件字节内容，文件未变化时直接使用缓存"""
+        st = os.stat(self.project_root / rel_path)
+        entry = self._file_bytes.get(rel_path)
+        if entry is None or entry[:2] != (st.st_mtime_ns, st.st_size):
+            entry = self._read_entry(rel_path)
+            self._file_bytes[rel_path] = entry
+        return entry[2]
+    
+    def _read_text(self, rel_path):
+        """读取文本文件内容 (与文本模式读取一致，统一换行符)"""
+        text = self._slurp(rel_path).decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def _load_yaml_cache(self):
+        """读取持久的 YAML 解析缓存，读取失败时使用空缓存"""
+        try:
+            with open(YAML_CACHE_FILE, 'rb') as f:
+                cache = pickle.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except Exception:
+            return {}
+    
+    def _save_yaml_cache(self):
+        """写回本次运行用到的 YAML 解析结果 (旧条目随之淘汰)"""
+        if not self._yaml_used or self._yaml_used.keys() == self._yaml_cache.keys():
+            return
+        try:
+            YAML_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = YAML_CACHE_FILE.with_suffix(".tmp")
+            with open(temp_file, 'wb') as f:
+                pickle.dump(self._yaml_used, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, YAML_CACHE_FILE)
+        except OSError:
+            pass
+    
+    def _cached_yaml(self, rel_path):
+        """解析 YAML 文件，文件未变化时直接使用缓存结果"""
+        path = self.project_root / rel_path
+        st = os.stat(path)
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        if self._yaml_cache is None:
+            self._yaml_cache = self._load_yaml_cache()
+        try:
+            data = self._yaml_cache[key]
+        except KeyError:
+            data = yaml.load(self._read_text(rel_path), Loader=_YAML_LOADER)
+        self._yaml_used[key] = data
+        return data
+    
+    def _parse(self, rel_path):
+        """解析 JSON 或 YAML 配置文件"""
+        if rel_path.endswith(".json"):
+            return self._json_loads(self._read_text(rel_path))
+        return self._cached_yaml(rel_path)
+    
+    def _load_all(self):
+        """一次性解析 CONFIG_FILES，解析失败时保存异常，留待使用时报告"""
+        for rel_path in self.CONFIG_FILES:
+            try:
+                self._parsed[rel_path] = self._parse(rel_path)
+            except Exception as e:
+                self._parsed[rel_path] = e
+    
+    def _config(self, rel_path):
+        """返回配置文件的解析结果 (调用方不应修改返回值)"""
+        try:
+            result = self._parsed[rel_path]
+        except KeyError:
+            return self._parse(rel_path)
+        if isinstance(result, Exception):
+            raise result
+        return result
     
     def test_directory_structure(self):
         """测试目录结构完整性"""
-        print("\n🗂️  测试目录结构...")
+        self.log_section("\n🗂️  测试目录结构...")
         
         required_dirs = [
             ".aceflow",
@@ -72,15 +366,14 @@ class AceFlowAcceptanceTest:
         ]
         
         for dir_path in required_dirs:
-            path = self.project_root / dir_path
             self.log_test(
                 f"目录存在: {dir_path}",
-                path.exists() and path.is_dir()
+                dir_path + "/" in self._present
             )
     
     def test_core_files(self):
         """测试核心文件存在性"""
-        print("\n📄 测试核心文件...")
+        self.log_section("\n📄 测试核心文件...")
         
         required_files = [
             ".aceflow/scripts/aceflow",
@@ -99,43 +392,38 @@ class AceFlowAcceptanceTest:
         ]
         
         for file_path in required_files:
-            path = self.project_root / file_path
             self.log_test(
                 f"文件存在: {file_path}",
-                path.exists() and path.is_file()
+                file_path in self._present
             )
     
     def test_file_permissions(self):
         """测试文件权限"""
-        print("\n🔐 测试文件权限...")
+        self.log_section("\n🔐 测试文件权限...")
         
         executable_files = [
             ".aceflow/scripts/aceflow",
             ".aceflow/scripts/wizard.py"
         ]
         
+        # os.access 对不存在的文件同样返回 False，无需先检查存在性
         for file_path in executable_files:
-            path = self.project_root / file_path
-            if path.exists():
-                is_executable = os.access(path, os.X_OK)
-                self.log_test(
-                    f"可执行权限: {file_path}",
-                    is_executable
-                )
+            self.log_test(
+                f"可执行权限: {file_path}",
+                os.access(self.project_root / file_path, os.X_OK)
+            )
     
     def test_config_files(self):
         """测试配置文件格式"""
-        print("\n⚙️  测试配置文件...")
+        self.log_section("\n⚙️  测试配置文件...")
         
         # 测试主配置文件
-        config_file = self.aceflow_dir / "config.yaml"
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            config = self._config(".aceflow/config.yaml")
             
             # 检查必需的配置项
             required_keys = ['project', 'flow', 'agile', 'ai', 'web']
-            all_keys_present = all(key in config for key in required_keys)
+            all_keys_present = set(required_keys).issubset(config)
             
             self.log_test(
                 "主配置文件格式正确",
@@ -151,13 +439,11 @@ class AceFlowAcceptanceTest:
             )
         
         # 测试状态文件
-        state_file = self.aceflow_dir / "state" / "project_state.json"
         try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+            state = self._config(".aceflow/state/project_state.json")
             
             required_keys = ['project_id', 'flow_mode', 'current_stage', 'stage_states']
-            all_keys_present = all(key in state for key in required_keys)
+            all_keys_present = set(required_keys).issubset(state)
             
             self.log_test(
                 "状态文件格式正确",
@@ -174,38 +460,38 @@ class AceFlowAcceptanceTest:
     
     def test_cli_commands(self):
         """测试CLI命令功能"""
-        print("\n🖥️  测试CLI命令...")
+        self.log_section("\n🖥️  测试CLI命令...")
         
         # 测试help命令
-        success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow help")
+        success, stdout, stderr = self.run_cli("help")
         self.log_test(
             "help命令正常",
             success and "AceFlow v2.0" in stdout
         )
         
         # 测试status命令
-        success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow status")
+        success, stdout, stderr = self.run_cli("status")
         self.log_test(
             "status命令正常",
             success and "项目状态" in stdout
         )
         
         # 测试start命令（如果还没有活跃阶段）
-        success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow start")
+        success, stdout, stderr = self.run_cli("start")
         if "已开始阶段" in stdout or "当前已有活跃阶段" in stdout:
             self.log_test("start命令正常", True)
         else:
             self.log_test("start命令正常", success)
         
         # 测试progress命令
-        success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow progress --progress 50")
+        success, stdout, stderr = self.run_cli("progress", "--progress", "50")
         if "进度更新" in stdout or "没有活跃的阶段" in stdout:
             self.log_test("progress命令正常", True)
         else:
             self.log_test("progress命令正常", success)
         
         # 测试web命令
-        success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow web")
+        success, stdout, stderr = self.run_cli("web")
         self.log_test(
             "web命令正常",
             success and ("Web界面已打开" in stdout or "index.html" in stdout)
@@ -213,16 +499,14 @@ class AceFlowAcceptanceTest:
     
     def test_flow_modes(self):
         """测试流程模式配置"""
-        print("\n🔄 测试流程模式...")
+        self.log_section("\n🔄 测试流程模式...")
         
-        flow_config_file = self.aceflow_dir / "config" / "flow_modes.yaml"
         try:
-            with open(flow_config_file, 'r', encoding='utf-8') as f:
-                flow_config = yaml.safe_load(f)
+            flow_config = self._config(".aceflow/config/flow_modes.yaml")
             
             # 检查三种模式是否都存在
             required_modes = ['minimal', 'standard', 'complete']
-            modes_exist = all(mode in flow_config['flow_modes'] for mode in required_modes)
+            modes_exist = set(required_modes).issubset(flow_config['flow_modes'])
             
             self.log_test(
                 "流程模式配置完整",
@@ -234,7 +518,7 @@ class AceFlowAcceptanceTest:
             minimal_mode = flow_config['flow_modes']['minimal']
             minimal_stages = minimal_mode.get('stages', {})
             expected_stages = ['P', 'D', 'R']
-            stages_correct = all(stage in minimal_stages for stage in expected_stages)
+            stages_correct = set(expected_stages).issubset(minimal_stages)
             
             self.log_test(
                 "轻量级模式阶段正确",
@@ -251,21 +535,15 @@ class AceFlowAcceptanceTest:
     
     def test_templates(self):
         """测试项目模板"""
-        print("\n📋 测试项目模板...")
+        self.log_section("\n📋 测试项目模板...")
         
         # 测试轻量级模板
-        minimal_template = self.aceflow_dir / "templates" / "minimal" / "template.yaml"
         try:
-            with open(minimal_template, 'r', encoding='utf-8') as f:
-                template = yaml.safe_load(f)
-            
-            has_project_config = 'project' in template
-            has_flow_config = 'flow' in template
-            has_init_config = 'initialization' in template
+            template = self._config(".aceflow/templates/minimal/template.yaml")
             
             self.log_test(
                 "轻量级模板配置正确",
-                has_project_config and has_flow_config and has_init_config
+                {'project', 'flow', 'initialization'}.issubset(template)
             )
             
         except Exception as e:
@@ -282,12 +560,10 @@ class AceFlowAcceptanceTest:
         ]
         
         for doc_file in template_docs:
-            path = self.project_root / doc_file
             content_exists = False
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    content_exists = len(content.strip()) > 0
+            if doc_file in self._present:
+                content = self._read_text(doc_file)
+                content_exists = len(content.strip()) > 0
             
             self.log_test(
                 f"模板文档: {Path(doc_file).name}",
@@ -296,52 +572,45 @@ class AceFlowAcceptanceTest:
     
     def test_web_interface(self):
         """测试Web界面"""
-        print("\n🌐 测试Web界面...")
+        self.log_section("\n🌐 测试Web界面...")
         
-        web_file = self.aceflow_dir / "web" / "index.html"
+        web_file = ".aceflow/web/index.html"
         
-        if web_file.exists():
-            with open(web_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+        if web_file in self._present:
+            content = self._read_text(web_file)
             
             # 检查关键HTML元素
-            has_title = "AceFlow" in content
-            has_styles = "<style>" in content
-            has_scripts = "<script>" in content
-            has_flow_modes = "flow-modes" in content
-            has_stages = "stages-container" in content
+            found = {m.group() for m in _HTML_MARKERS.finditer(content)}
             
             self.log_test(
                 "Web界面HTML结构完整",
-                has_title and has_styles and has_scripts
+                {"AceFlow", "<style>", "<script>"}.issubset(found)
             )
             
             self.log_test(
                 "Web界面功能组件完整",
-                has_flow_modes and has_stages
+                {"flow-modes", "stages-container"}.issubset(found)
             )
             
             # 检查响应式设计
-            has_responsive = "@media" in content
             self.log_test(
                 "Web界面支持响应式设计",
-                has_responsive
+                "@media" in found
             )
         else:
             self.log_test("Web界面文件存在", False)
     
     def test_agile_integration(self):
         """测试敏捷集成配置"""
-        print("\n🔄 测试敏捷集成...")
+        self.log_section("\n🔄 测试敏捷集成...")
         
-        agile_config_file = self.aceflow_dir / "config" / "agile_integration.yaml"
         try:
-            with open(agile_config_file, 'r', encoding='utf-8') as f:
-                agile_config = yaml.safe_load(f)
+            agile_config = self._config(".aceflow/config/agile_integration.yaml")
             
             # 检查敏捷框架配置
-            has_scrum = 'scrum' in agile_config.get('agile_frameworks', {})
-            has_kanban = 'kanban' in agile_config.get('agile_frameworks', {})
+            frameworks = agile_config.get('agile_frameworks', {})
+            has_scrum = 'scrum' in frameworks
+            has_kanban = 'kanban' in frameworks
             has_integration = 'integration_templates' in agile_config
             
             self.log_test(
@@ -351,14 +620,11 @@ class AceFlowAcceptanceTest:
             
             # 检查Scrum配置详细信息
             if has_scrum:
-                scrum_config = agile_config['agile_frameworks']['scrum']
-                has_ceremonies = 'ceremonies' in scrum_config
-                has_artifacts = 'artifacts' in scrum_config
-                has_integration_mapping = 'integration' in scrum_config
+                scrum_config = frameworks['scrum']
                 
                 self.log_test(
                     "Scrum配置详细完整",
-                    has_ceremonies and has_artifacts and has_integration_mapping
+                    {'ceremonies', 'artifacts', 'integration'}.issubset(scrum_config)
                 )
             
         except Exception as e:
@@ -370,32 +636,32 @@ class AceFlowAcceptanceTest:
     
     def test_wizard_functionality(self):
         """测试快速启动向导"""
-        print("\n🧙 测试快速启动向导...")
+        self.log_section("\n🧙 测试快速启动向导...")
         
         wizard_file = self.aceflow_dir / "scripts" / "wizard.py"
         
-        if wizard_file.exists():
+        if ".aceflow/scripts/wizard.py" in self._present:
             # 检查向导脚本的基本结构
-            with open(wizard_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self._read_text(".aceflow/scripts/wizard.py")
             
-            has_wizard_class = "class AceFlowWizard" in content
-            has_main_function = "def main(" in content
-            has_template_selection = "select_template" in content
-            has_project_config = "configure_project" in content
+            found = {m.group() for m in _WIZARD_MARKERS.finditer(content)}
             
             self.log_test(
                 "快速启动向导结构完整",
-                has_wizard_class and has_main_function
+                {"class AceFlowWizard", "def main("}.issubset(found)
             )
             
             self.log_test(
                 "向导功能模块完整",
-                has_template_selection and has_project_config
+                {"select_template", "configure_project"}.issubset(found)
             )
             
             # 测试向导脚本语法正确性
-            success, stdout, stderr = self.run_command("python3 -m py_compile .aceflow/scripts/wizard.py")
+            try:
+                py_compile.compile(str(wizard_file), doraise=True)
+                success = True
+            except py_compile.PyCompileError:
+                success = False
             self.log_test(
                 "向导脚本语法正确",
                 success
@@ -405,7 +671,7 @@ class AceFlowAcceptanceTest:
     
     def test_documentation_quality(self):
         """测试文档质量"""
-        print("\n📚 测试文档质量...")
+        self.log_section("\n📚 测试文档质量...")
         
         # 检查项目级文档
         doc_files = [
@@ -415,15 +681,14 @@ class AceFlowAcceptanceTest:
         ]
         
         for doc_file in doc_files:
-            path = self.project_root / doc_file
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+            if doc_file in self._present:
+                content = self._read_text(doc_file)
                 
                 # 检查文档长度和结构
                 has_content = len(content) > 1000  # 至少1000字符
-                has_headers = content.count('#') >= 5  # 至少5个标题
-                has_chinese = any('\u4e00' <= char <= '\u9fff' for char in content)  # 包含中文
+                # 至少5个标题 (先只统计开头部分，通常即可得出结论)
+                has_headers = content.count('#', 0, 4096) >= 5 or content.count('#') >= 5
+                has_chinese = _CJK_RE.search(content) is not None  # 包含中文
                 
                 self.log_test(
                     f"文档质量: {doc_file}",
@@ -434,35 +699,32 @@ class AceFlowAcceptanceTest:
     
     def test_integration_complete(self):
         """测试整体集成完整性"""
-        print("\n🔗 测试整体集成...")
+        self.log_section("\n🔗 测试整体集成...")
+        
+        # 在内存中保存当前状态，测试结束后 (包括出错时) 恢复
+        state_file = self.aceflow_dir / "state" / "project_state.json"
+        try:
+            original_state = self._slurp(".aceflow/state/project_state.json")
+        except OSError:
+            original_state = None
         
         # 测试从初始化到完成一个完整流程
         try:
-            # 备份当前状态
-            state_file = self.aceflow_dir / "state" / "project_state.json"
-            backup_file = self.aceflow_dir / "state" / "project_state_backup.json"
-            
-            if state_file.exists():
-                with open(state_file, 'r') as f:
-                    original_state = f.read()
-                with open(backup_file, 'w') as f:
-                    f.write(original_state)
-            
             # 测试完整工作流
             workflow_success = True
             
             # 1. 开始阶段
-            success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow start P")
+            success, stdout, stderr = self.run_cli("start", "P")
             if not success and "当前已有活跃阶段" not in stdout:
                 workflow_success = False
             
             # 2. 更新进度
-            success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow progress --progress 100")
+            success, stdout, stderr = self.run_cli("progress", "--progress", "100")
             if not success and "进度更新" not in stdout:
                 workflow_success = False
             
             # 3. 完成阶段
-            success, stdout, stderr = self.run_command("python3 .aceflow/scripts/aceflow complete")
+            success, stdout, stderr = self.run_cli("complete")
             if not success and "完成阶段" not in stdout:
                 workflow_success = False
             
@@ -471,86 +733,79 @@ class AceFlowAcceptanceTest:
                 workflow_success
             )
             
-            # 恢复原始状态
-            if backup_file.exists():
-                with open(backup_file, 'r') as f:
-                    original_state = f.read()
-                with open(state_file, 'w') as f:
-                    f.write(original_state)
-                backup_file.unlink()
-            
         except Exception as e:
             self.log_test(
                 "完整工作流测试",
                 False,
                 f"测试错误: {e}"
             )
+        finally:
+            # 恢复原始状态
+            if original_state is not None:
+                state_file.write_bytes(original_state)
     
     def run_all_tests(self):
         """运行所有测试"""
         print("🧪 开始AceFlow v2.0第1阶段验收测试")
         print("=" * 60)
         
-        start_time = time.time()
-        
-        # 运行所有测试
-        self.test_directory_structure()
-        self.test_core_files()
-        self.test_file_permissions()
-        self.test_config_files()
-        self.test_cli_commands()
-        self.test_flow_modes()
-        self.test_templates()
-        self.test_web_interface()
-        self.test_agile_integration()
-        self.test_wizard_functionality()
-        self.test_documentation_quality()
-        self.test_integration_complete()
-        
-        end_time = time.time()
-        duration = end_time - start_time
+        start_time = time.perf_counter_ns()
+        
+        self._snapshot()
+        self._batch_read([rel for rel in self.PREFETCH_FILES if rel in self._present])
+        self._load_all()
+        
+        # 运行所有测试: 互不影响的测试组并行执行，修改状态文件的测试组在主线程中
+        # 依次执行; 每组结果按 TEST_ORDER 顺序一次性输出，与串行执行时一致
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                name: executor.submit(self._run_buffered, name)
+                for name in self.TEST_ORDER
+                if name not in self.SERIAL_TESTS
+            }
+            for name in self.TEST_ORDER:
+                if name in futures:
+                    self._replay(futures[name].result())
+                else:
+                    self._replay(self._run_buffered(name))
+        self._save_yaml_cache()
+        
+        duration = (time.perf_counter_ns() - start_time) / 1e9
         
         # 生成测试报告
         self.generate_report(duration)
     
     def generate_report(self, duration):
         """生成测试报告"""
-        print("\n" + "=" * 60)
-        print("📊 验收测试报告")
-        print("=" * 60)
-        
         success_rate = (self.passed_tests / self.total_tests) * 100 if self.total_tests > 0 else 0
         
-        print(f"📈 测试统计:")
-        print(f"   总测试数: {self.total_tests}")
-        print(f"   通过测试: {self.passed_tests}")
-        print(f"   失败测试: {self.total_tests - self.passed_tests}")
-        print(f"   成功率: {success_rate:.1f}%")
-        print(f"   测试耗时: {duration:.2f}秒")
-        
-        print(f"\n📋 详细结果:")
-        for result in self.test_results:
-            print(f"   {result}")
+        lines = [
+            "\n" + "=" * 60,
+            "📊 验收测试报告",
+            "=" * 60,
+            "📈 测试统计:",
+            f"   总测试数: {self.total_tests}",
+            f"   通过测试: {self.passed_tests}",
+            f"   失败测试: {self.total_tests - self.passed_tests}",
+            f"   成功率: {success_rate:.1f}%",
+            f"   测试耗时: {duration:.2f}秒",
+            "\n📋 详细结果:",
+        ]
+        lines.extend(f"   {result}" for result in self.test_results)
         
         # 总体评估
-        print(f"\n🎯 验收结果:")
-        if success_rate >= 90:
-            print("   🎉 验收通过 - 第1阶段开发目标已达成")
-            print("   ✨ 系统功能完整，质量良好，可以进入第2阶段")
-        elif success_rate >= 80:
-            print("   ⚠️  有条件通过 - 存在少量问题需要修复")
-            print("   🔧 建议修复失败项后再进入下一阶段")
-        else:
-            print("   ❌ 验收未通过 - 存在重大问题需要解决")
-            print("   🛠️  需要重点修复失败项目")
+        lines.append("\n🎯 验收结果:")
+        lines.append(next(text for threshold, text in self.VERDICTS if success_rate >= threshold))
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # 保存报告
         self.save_report(duration, success_rate)
     
     def save_report(self, duration, success_rate):
         """保存测试报告到文件"""
+        now = datetime.now()
         report_data = {
-            "test_time": datetime.now().isoformat(),
+            "test_time": now.isoformat(),
             "duration_seconds": duration,
             "total_tests": self.total_tests,
             "passed_tests": self.passed_tests,
@@ -566,9 +821,8 @@ class AceFlowAcceptanceTest:
         reports_dir.mkdir(exist_ok=True)
         
         # 保存JSON格式报告
-        report_file = reports_dir / f"acceptance_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+        report_file = reports_dir / f"acceptance_test_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        report_file.write_bytes(self._json_dumps(report_data))
         
         print(f"\n💾 测试报告已保存: {report_file}")
 
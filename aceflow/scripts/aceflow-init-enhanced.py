@@ -9,13 +9,20 @@ AI Agent 增强层初始化工具 - 用户体验优化版
 import os
 import sys
 import json
-import shutil
 import argparse
-import subprocess
+import errno
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
-import tempfile
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选加速依赖，缺失时回退到标准库 json
+    orjson = None
 
 # 导入平台兼容性模块
 try:
@@ -31,40 +38,134 @@ SCRIPT_NAME = "aceflow-init.py"
 VERSION = "3.0.1"
 ACEFLOW_HOME = os.environ.get('ACEFLOW_HOME', 
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 安装目录下的路径在进程内不会变化，只构造一次
+_ACEFLOW_HOME_PATH = Path(ACEFLOW_HOME)
+_TEMPLATES_DIR = _ACEFLOW_HOME_PATH / "templates"
+_SCRIPTS_DIR = _ACEFLOW_HOME_PATH / "scripts"
+
+# .clinerules 模板 (占位符: project_name, mode, timestamp)
+_CLINERULES_TEMPLATE = """# AceFlow v3.0 - AI Agent 集成配置
+# 项目: {project_name}
+# 模式: {mode}
+# 初始化时间: {timestamp}
+
+## 工作模式配置
+AceFlow模式: {mode}
+输出目录: aceflow_result/
+配置目录: .aceflow/
+项目名称: {project_name}
+
+## 核心工作原则  
+1. 所有项目文档和代码必须输出到 aceflow_result/ 目录
+2. 严格按照 .aceflow/template.yaml 中定义的流程执行
+3. 每个阶段完成后更新项目状态文件
+4. 保持跨对话的工作记忆和上下文连续性
+5. 遵循AceFlow v3.0规范进行标准化输出
+
+## 质量标准
+- 代码质量: 遵循项目编码规范，注释完整
+- 文档质量: 结构清晰，内容完整，格式统一
+- 测试覆盖: 根据模式要求执行相应测试策略
+- 交付标准: 符合 aceflow-spec_v3.0.md 规范
+
+## 工具集成命令
+- python aceflow-validate.py: 验证项目状态和合规性
+- python aceflow-stage.py: 管理项目阶段和进度
+- python aceflow-templates.py: 管理模板配置
+
+记住: AceFlow是AI Agent的增强层，通过规范化输出和状态管理，实现跨对话的工作连续性。
+"""
+
+# 项目工具脚本使用说明 README_ACEFLOW.md
+_README_ACEFLOW = """# AceFlow 项目工具脚本
+
+本项目已配置为AceFlow项目，包含以下管理工具:
+
+## 🛠️ 可用命令
+
+### 📊 项目状态管理
+```bash
+python aceflow-stage.py status    # 查看当前项目状态
+python aceflow-stage.py next      # 推进到下一阶段
+python aceflow-stage.py list      # 列出所有阶段
+```
+
+### 🔍 项目验证
+```bash
+python aceflow-validate.py        # 快速验证
+python aceflow-validate.py --mode complete --report  # 完整验证
+```
+
+### 🛠️ 模板管理
+```bash
+python aceflow-templates.py list  # 查看可用模板
+python aceflow-templates.py info standard  # 查看模式详情
+```
+
+## 📁 项目结构
+
+- `aceflow_result/` - 所有AI工作产出
+- `.aceflow/` - 流程配置文件
+- `.clinerules` - AI Agent工作规则
+
+## 🚀 快速开始
+
+1. 与AI开始对话，AI将自动按照配置的流程工作
+2. 使用 `python aceflow-stage.py status` 随时查看进度
+3. 所有工作成果将保存在 `aceflow_result/` 目录
+
+享受高效的AI协作开发体验！
+"""
+
+# 输出不是终端或设置了 NO_COLOR 时不使用颜色
+_USE_COLOR = ('NO_COLOR' not in os.environ
+              and sys.stdout is not None and sys.stdout.isatty())
 
 # 颜色定义 (ANSI色彩代码)
 class Colors:
-    RED = '\033[0;31m'
-    GREEN = '\033[0;32m'
-    YELLOW = '\033[1;33m'
-    BLUE = '\033[0;34m'
-    PURPLE = '\033[0;35m'
-    CYAN = '\033[0;36m'
-    BOLD = '\033[1m'
-    NC = '\033[0m'  # No Color
+    RED = '\033[0;31m' if _USE_COLOR else ''
+    GREEN = '\033[0;32m' if _USE_COLOR else ''
+    YELLOW = '\033[1;33m' if _USE_COLOR else ''
+    BLUE = '\033[0;34m' if _USE_COLOR else ''
+    PURPLE = '\033[0;35m' if _USE_COLOR else ''
+    CYAN = '\033[0;36m' if _USE_COLOR else ''
+    BOLD = '\033[1m' if _USE_COLOR else ''
+    NC = '\033[0m' if _USE_COLOR else ''  # No Color
 
 class EnhancedLogger:
     """增强日志工具类"""
     
+    # 各级别的日志前缀在类定义时预先拼接
+    _INFO = f"{Colors.BLUE}[INFO]{Colors.NC} "
+    _SUCCESS = f"{Colors.GREEN}[SUCCESS]{Colors.NC} "
+    _WARNING = f"{Colors.YELLOW}[WARNING]{Colors.NC} "
+    _ERROR = f"{Colors.RED}[ERROR]{Colors.NC} "
+    _IMPORTANT = f"{Colors.BOLD}{Colors.CYAN}[IMPORTANT]{Colors.NC} "
+    _HEADER = f"""{Colors.PURPLE}
+╔══════════════════════════════════════╗
+║      AceFlow v3.0 Enhanced 初始化     ║
+║       AI Agent 增强层配置工具        ║
+╚══════════════════════════════════════╝{Colors.NC}"""
+    
     @staticmethod
     def info(message: str):
-        print(f"{Colors.BLUE}[INFO]{Colors.NC} {message}")
+        print(EnhancedLogger._INFO, message, sep='')
     
     @staticmethod
     def success(message: str):
-        print(f"{Colors.GREEN}[SUCCESS]{Colors.NC} {message}")
+        print(EnhancedLogger._SUCCESS, message, sep='')
     
     @staticmethod
     def warning(message: str):
-        print(f"{Colors.YELLOW}[WARNING]{Colors.NC} {message}")
+        print(EnhancedLogger._WARNING, message, sep='')
     
     @staticmethod
     def error(message: str):
-        print(f"{Colors.RED}[ERROR]{Colors.NC} {message}")
+        print(EnhancedLogger._ERROR, message, sep='')
     
     @staticmethod
     def important(message: str):
-        print(f"{Colors.BOLD}{Colors.CYAN}[IMPORTANT]{Colors.NC} {message}")
+        print(EnhancedLogger._IMPORTANT, message, sep='')
     
     @staticmethod
     def step(step_num: int, total_steps: int, message: str):
@@ -72,19 +173,82 @@ class EnhancedLogger:
     
     @staticmethod
     def header():
-        print(f"""{Colors.PURPLE}
-╔══════════════════════════════════════╗
-║      AceFlow v3.0 Enhanced 初始化     ║
-║       AI Agent 增强层配置工具        ║
-╚══════════════════════════════════════╝{Colors.NC}""")
+        print(EnhancedLogger._HEADER)
+
+def _fast_copy(src: Path, dst: Path, mode: int = 0o755):
+    """在内核中复制文件内容 (os.copy_file_range)，不支持时回退到 shutil.copyfile
+    
+    目标文件权限设为 mode；与 shutil.copy2 不同，不复制时间戳等元数据。
+    源文件与目标文件相同时抛出 shutil.SameFileError。
+    """
+    if hasattr(os, "copy_file_range"):
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            # 先不截断打开目标文件，确认不是源文件本身后再清空
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT, mode)
+            try:
+                src_st = os.fstat(src_fd)
+                dst_st = os.fstat(dst_fd)
+                if (src_st.st_dev, src_st.st_ino) == (dst_st.st_dev, dst_st.st_ino):
+                    import shutil
+                    raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+                os.ftruncate(dst_fd, 0)
+                remaining = src_st.st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                os.fchmod(dst_fd, mode)
+                return
+            except OSError as e:
+                # 跨文件系统或文件系统不支持时回退
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    import shutil  # 仅回退路径需要
+    shutil.copyfile(src, dst)
+    os.chmod(dst, mode)
 
 class DirectoryHandler:
     """目录处理器 - 解决用户目录混淆问题"""
     
+    # 典型的AceFlow源码结构: (顶层名称, 需进一步确认的相对路径)
+    SOURCE_INDICATORS = (
+        ("aceflow-spec.md", None),
+        ("scripts", "scripts/aceflow-init.py"),
+        ("pateoas", "pateoas/__init__.py"),
+        ("templates", "templates/complete/template.yaml"),
+    )
+    
+    @staticmethod
+    def scan_entry_names(directory: str) -> frozenset:
+        """列出目录的顶层条目名称 (目录不存在时为空集合)"""
+        try:
+            with os.scandir(directory) as entries:
+                return frozenset(entry.name for entry in entries)
+        except OSError:
+            return frozenset()
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def list_entry_names(directory: str) -> frozenset:
+        """按路径缓存的 scan_entry_names，仅用于运行期间不会变化的安装目录"""
+        return DirectoryHandler.scan_entry_names(directory)
+    
     @staticmethod
     def get_target_directory(args_directory: str) -> Path:
         """智能确定目标目录"""
-        current_dir = Path.cwd()
+        return DirectoryHandler._resolve_target_directory(args_directory, os.getcwd())
+    
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _resolve_target_directory(args_directory: str, cwd: str) -> Path:
+        """解析目标目录的绝对路径 (按参数和当前工作目录缓存 resolve() 结果)"""
+        current_dir = Path(cwd)
         
         if args_directory == ".":
             # 用户想在当前目录初始化
@@ -107,36 +271,32 @@ class DirectoryHandler:
             return False, f"⚠️ 检测到这是AceFlow源码目录，不建议在此初始化项目。\n   建议在其他目录初始化您的项目。"
         
         # 检查是否已经是AceFlow项目
-        if (target_dir / ".clinerules").exists() and not force:
+        if not force and (target_dir / ".clinerules").exists():
             return False, f"❌ 目录已包含AceFlow配置。\n   使用 --force 强制覆盖，或选择其他目录。"
         
-        # 检查目录权限
+        # 检查目录权限 (目录尚不存在时检查最近的已存在上级目录，目录在初始化时才创建)
         try:
-            target_dir.mkdir(parents=True, exist_ok=True)
-            # 测试写入权限
-            test_file = target_dir / ".aceflow_test"
-            test_file.write_text("test")
-            test_file.unlink()
-        except PermissionError:
-            return False, f"❌ 目录权限不足: {target_dir}\n   请选择有写入权限的目录。"
+            existing_dir = target_dir
+            while not existing_dir.exists() and existing_dir != existing_dir.parent:
+                existing_dir = existing_dir.parent
+            if not existing_dir.is_dir():
+                return False, f"❌ 目录访问失败: 路径不是目录: {existing_dir}"
+            if not os.access(existing_dir, os.W_OK | os.X_OK,
+                             effective_ids=os.access in os.supports_effective_ids):
+                return False, f"❌ 目录权限不足: {target_dir}\n   请选择有写入权限的目录。"
         except Exception as e:
             return False, f"❌ 目录访问失败: {e}"
         
         return True, ""
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def is_aceflow_source_directory(path: Path) -> bool:
         """检查是否为AceFlow源码目录"""
-        # 检查典型的AceFlow源码结构
-        indicators = [
-            "aceflow-spec.md",
-            "scripts/aceflow-init.py",
-            "pateoas/__init__.py",
-            "templates/complete/template.yaml"
-        ]
-        
-        for indicator in indicators:
-            if (path / indicator).exists():
+        # 先用一次目录扫描排除，只对存在的顶层条目再检查具体文件
+        names = DirectoryHandler.scan_entry_names(str(path))
+        for top_level, indicator in DirectoryHandler.SOURCE_INDICATORS:
+            if top_level in names and (indicator is None or (path / indicator).exists()):
                 return True
         
         return False
@@ -156,16 +316,23 @@ class DirectoryHandler:
         # 显示目录内容概况
         if target_dir.exists():
             try:
-                contents = list(target_dir.iterdir())
-                if contents:
-                    print(f"   目录内容: {len(contents)} 个文件/文件夹")
-                    if len(contents) <= 5:
-                        for item in contents:
-                            print(f"     - {item.name}")
+                # 只保留前5个名称，其余条目仅计数
+                names = []
+                count = 0
+                with os.scandir(target_dir) as entries:
+                    for entry in entries:
+                        if count < 5:
+                            names.append(entry.name)
+                        count += 1
+                if count:
+                    print(f"   目录内容: {count} 个文件/文件夹")
+                    if count <= 5:
+                        for name in names:
+                            print(f"     - {name}")
                     else:
-                        print(f"     - {contents[0].name}")
-                        print(f"     - {contents[1].name}")
-                        print(f"     - ... (还有 {len(contents)-2} 个项目)")
+                        print(f"     - {names[0]}")
+                        print(f"     - {names[1]}")
+                        print(f"     - ... (还有 {count-2} 个项目)")
                 else:
                     print(f"   {Colors.GREEN}✓{Colors.NC} 目录为空，适合初始化")
             except Exception:
@@ -174,6 +341,14 @@ class DirectoryHandler:
 class EnhancedAceFlowInit:
     """增强版AceFlow初始化器"""
     
+    # AI访谈评分表: 答案 (1-4) -> 各模式加分
+    INTERVIEW_SCORES = {
+        1: {"minimal": 3, "standard": 1},
+        2: {"minimal": 1, "standard": 3, "complete": 1},
+        3: {"standard": 2, "complete": 3},
+        4: {"complete": 4},
+    }
+    
     def __init__(self):
         self.logger = EnhancedLogger()
         self.step_counter = 0
@@ -201,17 +376,16 @@ class EnhancedAceFlowInit:
         except ImportError as e:
             issues.append(f"Python标准库模块缺失: {e}")
         
-        # 检查AceFlow HOME
-        aceflow_home_path = Path(ACEFLOW_HOME)
-        if not aceflow_home_path.exists():
+        # 检查AceFlow HOME (一次目录扫描同时用于检查模板目录)
+        home_names = DirectoryHandler.list_entry_names(ACEFLOW_HOME)
+        if not home_names and not _ACEFLOW_HOME_PATH.exists():
             issues.append(f"AceFlow安装目录不存在: {ACEFLOW_HOME}")
         else:
             self.logger.success(f"✓ AceFlow安装目录: {ACEFLOW_HOME}")
         
         # 检查模板目录
-        templates_dir = aceflow_home_path / "templates"
-        if not templates_dir.exists():
-            issues.append(f"模板目录不存在: {templates_dir}")
+        if _TEMPLATES_DIR.name not in home_names:
+            issues.append(f"模板目录不存在: {_TEMPLATES_DIR}")
         else:
             self.logger.success("✓ 模板目录可用")
         
@@ -259,7 +433,7 @@ class EnhancedAceFlowInit:
                     print("项目名称不能为空，请重新输入。")
         
         if not project_name:
-            project_name = f"AceFlow项目-{datetime.now().strftime('%Y%m%d_%H%M')}"
+            project_name = f"AceFlow项目-{time.strftime('%Y%m%d_%H%M')}"
             self.logger.info(f"使用默认项目名称: {project_name}")
         
         # 模式选择
@@ -315,7 +489,7 @@ class EnhancedAceFlowInit:
             ("质量要求", "质量要求? (1=基本可用, 2=生产就绪, 3=企业级, 4=关键任务)")
         ]
         
-        scores = {"minimal": 0, "standard": 0, "complete": 0}
+        scores = Counter({"minimal": 0, "standard": 0, "complete": 0})
         
         print(f"\n{Colors.CYAN}🎯 AI智能访谈 - 为您推荐最适合的工作模式{Colors.NC}")
         
@@ -324,28 +498,16 @@ class EnhancedAceFlowInit:
                 try:
                     answer = input(f"\n{question} [1-4]: ").strip()
                     score = int(answer)
-                    if 1 <= score <= 4:
-                        # 评分逻辑
-                        if score == 1:
-                            scores["minimal"] += 3
-                            scores["standard"] += 1
-                        elif score == 2:
-                            scores["minimal"] += 1
-                            scores["standard"] += 3
-                            scores["complete"] += 1
-                        elif score == 3:
-                            scores["standard"] += 2
-                            scores["complete"] += 3
-                        else:  # score == 4
-                            scores["complete"] += 4
+                    if score in self.INTERVIEW_SCORES:
+                        scores.update(self.INTERVIEW_SCORES[score])
                         break
                     else:
                         print("请输入 1-4 之间的数字。")
                 except ValueError:
                     print("请输入有效的数字。")
         
-        # 确定推荐模式
-        recommended_mode = max(scores, key=scores.get)
+        # 确定推荐模式 (同分时取先出现的模式)
+        recommended_mode = scores.most_common(1)[0][0]
         
         print(f"\n{Colors.PURPLE}🎯 AI分析结果:{Colors.NC}")
         print(f"   推荐模式: {Colors.BOLD}{recommended_mode.upper()}{Colors.NC}")
@@ -368,9 +530,7 @@ class EnhancedAceFlowInit:
     def initialize_project(self, mode: str, project_name: str, target_dir: Path) -> bool:
         """初始化项目"""
         try:
-            # 切换到目标目录
-            original_cwd = Path.cwd()
-            os.chdir(target_dir)
+            target_dir.mkdir(parents=True, exist_ok=True)
             
             self.next_step(f"初始化 {mode} 模式项目配置...")
             
@@ -378,7 +538,7 @@ class EnhancedAceFlowInit:
             self.create_project_structure(mode, project_name, target_dir)
             
             self.next_step("创建AI Agent集成配置...")
-            self.create_ai_agent_config(mode, project_name)
+            self.create_ai_agent_config(mode, project_name, target_dir)
             
             self.next_step("复制项目级工作脚本...")
             self.copy_project_scripts(target_dir)
@@ -386,9 +546,6 @@ class EnhancedAceFlowInit:
             self.next_step("初始化项目状态管理...")
             self.create_project_state(mode, project_name, target_dir)
             
-            # 恢复原始工作目录
-            os.chdir(original_cwd)
-            
             return True
             
         except Exception as e:
@@ -415,50 +572,24 @@ class EnhancedAceFlowInit:
             dir_path.mkdir(exist_ok=True)
             self.logger.success(f"✓ 创建目录: {dir_name}")
     
-    def create_ai_agent_config(self, mode: str, project_name: str):
+    def create_ai_agent_config(self, mode: str, project_name: str, target_dir: Path):
         """创建AI Agent配置"""
         # 创建.clinerules文件
-        clinerules_content = f"""# AceFlow v3.0 - AI Agent 集成配置
-# 项目: {project_name}
-# 模式: {mode}
-# 初始化时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## 工作模式配置
-AceFlow模式: {mode}
-输出目录: aceflow_result/
-配置目录: .aceflow/
-项目名称: {project_name}
-
-## 核心工作原则  
-1. 所有项目文档和代码必须输出到 aceflow_result/ 目录
-2. 严格按照 .aceflow/template.yaml 中定义的流程执行
-3. 每个阶段完成后更新项目状态文件
-4. 保持跨对话的工作记忆和上下文连续性
-5. 遵循AceFlow v3.0规范进行标准化输出
-
-## 质量标准
-- 代码质量: 遵循项目编码规范，注释完整
-- 文档质量: 结构清晰，内容完整，格式统一
-- 测试覆盖: 根据模式要求执行相应测试策略
-- 交付标准: 符合 aceflow-spec_v3.0.md 规范
-
-## 工具集成命令
-- python aceflow-validate.py: 验证项目状态和合规性
-- python aceflow-stage.py: 管理项目阶段和进度
-- python aceflow-templates.py: 管理模板配置
-
-记住: AceFlow是AI Agent的增强层，通过规范化输出和状态管理，实现跨对话的工作连续性。
-"""
+        clinerules_content = _CLINERULES_TEMPLATE.format_map({
+            "project_name": project_name,
+            "mode": mode,
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        })
         
+        clinerules_path = target_dir / ".clinerules"
         if COMPATIBILITY_AVAILABLE:
-            success, msg = SafeFileOperations.safe_write_text(Path(".clinerules"), clinerules_content)
+            success, msg = SafeFileOperations.safe_write_text(clinerules_path, clinerules_content)
             if success:
                 self.logger.success("✓ AI Agent配置文件已创建")
             else:
                 self.logger.warning(f"配置文件创建警告: {msg}")
         else:
-            with open(".clinerules", 'w', encoding='utf-8') as f:
-                f.write(clinerules_content)
+            clinerules_path.write_bytes(clinerules_content.encode('utf-8'))
             self.logger.success("✓ AI Agent配置文件已创建")
     
     def copy_project_scripts(self, target_dir: Path):
@@ -469,78 +600,54 @@ AceFlow模式: {mode}
             "aceflow-templates.py"
         ]
         
-        script_source_dir = Path(ACEFLOW_HOME) / "scripts"
-        copied_count = 0
         
-        for script in project_scripts:
-            source_path = script_source_dir / script
-            target_path = target_dir / script
+        # 创建使用说明
+        readme_path = target_dir / "README_ACEFLOW.md"
+        copied_count = 0
+        # 一次目录扫描确认可用的源脚本
+        available_scripts = DirectoryHandler.list_entry_names(str(_SCRIPTS_DIR))
+        
+        # 脚本复制和使用说明写入互不依赖，并发执行；结果按原顺序输出
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            copies = {
+                script: executor.submit(self._copy_script, _SCRIPTS_DIR / script, target_dir / script)
+                for script in project_scripts
+                if script in available_scripts
+            }
+            if COMPATIBILITY_AVAILABLE:
+                readme_future = executor.submit(
+                    SafeFileOperations.safe_write_text, readme_path, _README_ACEFLOW)
+            else:
+                readme_future = executor.submit(
+                    readme_path.write_bytes, _README_ACEFLOW.encode('utf-8'))
             
-            if source_path.exists():
-                if COMPATIBILITY_AVAILABLE:
-                    success, msg = SafeFileOperations.safe_copy_file(source_path, target_path)
+            for script in project_scripts:
+                if script in copies:
+                    success, msg = copies[script].result()
                     if success:
                         self.logger.success(f"✓ 已复制: {script}")
                         copied_count += 1
                     else:
                         self.logger.warning(f"复制脚本警告: {msg}")
                 else:
-                    shutil.copy2(source_path, target_path)
-                    target_path.chmod(0o755)
-                    self.logger.success(f"✓ 已复制: {script}")
-                    copied_count += 1
-            else:
-                self.logger.warning(f"⚠️ 源脚本不存在: {source_path}")
-        
-        # 创建使用说明
-        readme_content = """# AceFlow 项目工具脚本
-
-本项目已配置为AceFlow项目，包含以下管理工具:
-
-## 🛠️ 可用命令
-
-### 📊 项目状态管理
-```bash
-python aceflow-stage.py status    # 查看当前项目状态
-python aceflow-stage.py next      # 推进到下一阶段
-python aceflow-stage.py list      # 列出所有阶段
-```
-
-### 🔍 项目验证
-```bash
-python aceflow-validate.py        # 快速验证
-python aceflow-validate.py --mode complete --report  # 完整验证
-```
-
-### 🛠️ 模板管理
-```bash
-python aceflow-templates.py list  # 查看可用模板
-python aceflow-templates.py info standard  # 查看模式详情
-```
-
-## 📁 项目结构
-
-- `aceflow_result/` - 所有AI工作产出
-- `.aceflow/` - 流程配置文件
-- `.clinerules` - AI Agent工作规则
-
-## 🚀 快速开始
-
-1. 与AI开始对话，AI将自动按照配置的流程工作
-2. 使用 `python aceflow-stage.py status` 随时查看进度
-3. 所有工作成果将保存在 `aceflow_result/` 目录
-
-享受高效的AI协作开发体验！
-"""
-        
-        readme_path = target_dir / "README_ACEFLOW.md"
-        if COMPATIBILITY_AVAILABLE:
-            SafeFileOperations.safe_write_text(readme_path, readme_content)
-        else:
-            readme_path.write_text(readme_content, encoding='utf-8')
+                    self.logger.warning(f"⚠️ 源脚本不存在: {_SCRIPTS_DIR / script}")
+            
+            readme_future.result()
         
         self.logger.success(f"✓ 项目脚本安装完成 ({copied_count}/{len(project_scripts)})")
     
+    @staticmethod
+    def _copy_script(source_path: Path, target_path: Path) -> tuple[bool, str]:
+        """复制单个项目脚本，返回 (是否成功, 消息)"""
+        if COMPATIBILITY_AVAILABLE:
+            return SafeFileOperations.safe_copy_file(source_path, target_path)
+        import shutil  # 仅用于识别 SameFileError
+        try:
+            _fast_copy(source_path, target_path)
+        except shutil.SameFileError:
+            return True, "源文件和目标文件相同，跳过复制"
+        return True, ""
+    
     def create_project_state(self, mode: str, project_name: str, target_dir: Path):
         """创建项目状态文件"""
         aceflow_result_dir = target_dir / "aceflow_result"
@@ -575,17 +682,21 @@ python aceflow-templates.py info standard  # 查看模式详情
         }
         
         state_file = aceflow_result_dir / "current_state.json"
+        state_bytes = self._json_dumps(current_state)
         if COMPATIBILITY_AVAILABLE:
-            SafeFileOperations.safe_write_text(
-                state_file, 
-                json.dumps(current_state, ensure_ascii=False, indent=2)
-            )
+            SafeFileOperations.safe_write_text(state_file, state_bytes.decode('utf-8'))
         else:
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(current_state, f, ensure_ascii=False, indent=2)
+            state_file.write_bytes(state_bytes)
         
         self.logger.success("✓ 项目状态文件已创建")
     
+    @staticmethod
+    def _json_dumps(obj: Any) -> bytes:
+        """序列化为缩进格式的UTF-8 JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    
     def _get_first_stage(self, mode: str) -> str:
         """获取首个阶段"""
         stage_map = {
@@ -620,46 +731,8 @@ python aceflow-templates.py info standard  # 查看模式详情
         
         print(f"\n{Colors.GREEN}✨ 现在您可以享受智能化的AI协作开发体验！{Colors.NC}")
     
-    def run(self):
+    def run(self, args: argparse.Namespace) -> int:
         """主运行函数"""
-        parser = argparse.ArgumentParser(
-            description="AceFlow v3.0 Enhanced 项目初始化工具",
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-            epilog="""
-使用示例:
-  %(prog)s                                    # 在当前目录初始化
-  %(prog)s --directory ./my-project          # 在指定目录初始化  
-  %(prog)s --mode smart --interactive        # 智能交互模式
-  %(prog)s --project "我的项目" --force       # 强制覆盖已有配置
-
-模式说明:
-  minimal   - 最简流程，适合快速原型
-  standard  - 标准流程，适合团队协作  
-  complete  - 完整流程，适合企业项目
-  smart     - 智能流程，AI自动推荐
-            """
-        )
-        
-        parser.add_argument("-m", "--mode", 
-                          choices=["minimal", "standard", "complete", "smart"],
-                          help="指定工作流程模式")
-        parser.add_argument("-p", "--project", 
-                          help="指定项目名称")
-        parser.add_argument("-d", "--directory", 
-                          default=".",
-                          help="指定项目目录 (默认: 当前目录)")
-        parser.add_argument("-i", "--interactive", 
-                          action="store_true",
-                          help="启用交互式配置")
-        parser.add_argument("-f", "--force", 
-                          action="store_true",
-                          help="强制覆盖已存在的配置")
-        parser.add_argument("-v", "--version", 
-                          action="version",
-                          version=f"AceFlow Enhanced Init v{VERSION}")
-        
-        args = parser.parse_args()
-        
         try:
             # 显示标题
             self.logger.header()
@@ -693,10 +766,51 @@ python aceflow-templates.py info standard  # 查看模式详情
                         print(f"   - {suggestion}")
             return 1
 
+def create_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        description="AceFlow v3.0 Enhanced 项目初始化工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  %(prog)s                                    # 在当前目录初始化
+  %(prog)s --directory ./my-project          # 在指定目录初始化  
+  %(prog)s --mode smart --interactive        # 智能交互模式
+  %(prog)s --project "我的项目" --force       # 强制覆盖已有配置
+
+模式说明:
+  minimal   - 最简流程，适合快速原型
+  standard  - 标准流程，适合团队协作  
+  complete  - 完整流程，适合企业项目
+  smart     - 智能流程，AI自动推荐
+        """
+    )
+    
+    parser.add_argument("-m", "--mode", 
+                      choices=["minimal", "standard", "complete", "smart"],
+                      help="指定工作流程模式")
+    parser.add_argument("-p", "--project", 
+                      help="指定项目名称")
+    parser.add_argument("-d", "--directory", 
+                      default=".",
+                      help="指定项目目录 (默认: 当前目录)")
+    parser.add_argument("-i", "--interactive", 
+                      action="store_true",
+                      help="启用交互式配置")
+    parser.add_argument("-f", "--force", 
+                      action="store_true",
+                      help="强制覆盖已存在的配置")
+    parser.add_argument("-v", "--version", 
+                      action="version",
+                      version=f"AceFlow Enhanced Init v{VERSION}")
+    return parser
+
 def main():
     """主函数"""
+    # 先解析参数: --version / --help 在此直接退出，无需构造初始化器
+    args = create_parser().parse_args()
     app = EnhancedAceFlowInit()
-    return app.run()
+    return app.run(args)
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
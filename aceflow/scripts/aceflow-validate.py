@@ -5,14 +5,92 @@ AI Agent 增强层合规性检查工具
 """
 
 import argparse
+import copy
 import json
+import mmap
 import os
-import re
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选加速依赖，缺失时回退到标准库 json
+    orjson = None
+
+# AceFlow命名规范允许的文件名字符: 字母、数字、下划线、连字符和点
+_VALID_NAME_BYTES = (b"abcdefghijklmnopqrstuvwxyz"
+                     b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+                     b"0123456789_.-")
+
+# 项目状态文件必须包含的顶层字段 (按输出顺序)
+REQUIRED_STATE_FIELDS = ("project", "flow", "memory", "quality")
+
+# 各模式下输出目录中应存在的文件
+EXPECTED_FILES_BY_MODE = {
+    "minimal": ("current_state.json", "stage_progress.json"),
+    "standard": ("current_state.json", "stage_progress.json", "user_stories.md", "tasks_planning.md"),
+    "complete": ("current_state.json", "stage_progress.json", "s1_user_story.md", "s2_tasks_group.md"),
+    "smart": ("current_state.json", "stage_progress.json", "project_analysis.json"),
+}
+
+# 自动修复时生成的默认项目状态; 时间戳字段在写入时填充
+DEFAULT_STATE = {
+    "project": {
+        "name": "修复的项目",
+        "mode": "standard",
+        "created_at": None,
+        "last_updated": None,
+        "version": "3.0.0"
+    },
+    "flow": {
+        "current_stage": "initialized",
+        "completed_stages": [],
+        "progress_percentage": 0
+    },
+    "memory": {
+        "enabled": True,
+        "last_session": None,
+        "context_preserved": False
+    },
+    "quality": {
+        "standards_applied": False,
+        "compliance_checked": True,
+        "last_validation": None
+    }
+}
+DEFAULT_STATE_TIMESTAMPS = (
+    ("project", "created_at"),
+    ("project", "last_updated"),
+    ("memory", "last_session"),
+    ("quality", "last_validation"),
+)
+
+# 自动修复时生成的默认 .clinerules 内容
+DEFAULT_CLINERULES = """# AceFlow v3.0 - AI Agent 集成配置
+# 自动修复生成
+
+## 工作模式配置
+AceFlow模式: standard
+输出目录: aceflow_result/
+配置目录: .aceflow/
+
+## 核心工作原则  
+1. 所有项目文档和代码必须输出到 aceflow_result/ 目录
+2. 严格按照 .aceflow/template.yaml 中定义的流程执行
+3. 每个阶段完成后更新项目状态文件
+4. 保持跨对话的工作记忆和上下文连续性
+
+## 质量标准
+- 代码质量: 遵循项目编码规范，注释完整
+- 文档质量: 结构清晰，内容完整，格式统一
+- 测试覆盖: 根据模式要求执行相应测试策略
+- 交付标准: 符合 aceflow-spec_v3.0.md 规范
+
+记住: AceFlow是AI Agent的增强层，通过规范化输出和状态管理，实现跨对话的工作连续性。
+"""
 
 
 class Colors:
@@ -29,35 +107,50 @@ class Colors:
 class ValidationLogger:
     """验证日志记录器"""
     
+    # 各级别的日志前缀在类定义时预先拼接
+    _INFO = f"{Colors.BLUE}[INFO]{Colors.NC} "
+    _PASS = f"{Colors.GREEN}[PASS]{Colors.NC} "
+    _WARN = f"{Colors.YELLOW}[WARN]{Colors.NC} "
+    _FAIL = f"{Colors.RED}[FAIL]{Colors.NC} "
+    _ERROR = f"{Colors.RED}[ERROR]{Colors.NC} "
+    
     def __init__(self, silent_mode: bool = False):
         self.silent_mode = silent_mode
         self.total_checks = 0
         self.passed_checks = 0
         self.failed_checks = 0
         self.warning_checks = 0
+        # 日志先缓存，在每个检查阶段结束时由 flush() 一次性输出
+        self._buffer: List[str] = []
     
     def info(self, message: str):
         if not self.silent_mode:
-            print(f"{Colors.BLUE}[INFO]{Colors.NC} {message}")
+            self._buffer.append(self._INFO + message + '\n')
     
     def success(self, message: str):
         if not self.silent_mode:
-            print(f"{Colors.GREEN}[PASS]{Colors.NC} {message}")
+            self._buffer.append(self._PASS + message + '\n')
         self.passed_checks += 1
         self.total_checks += 1
     
     def warning(self, message: str):
         if not self.silent_mode:
-            print(f"{Colors.YELLOW}[WARN]{Colors.NC} {message}")
+            self._buffer.append(self._WARN + message + '\n')
         self.warning_checks += 1
         self.total_checks += 1
     
     def error(self, message: str):
         if not self.silent_mode:
-            print(f"{Colors.RED}[FAIL]{Colors.NC} {message}")
+            self._buffer.append(self._FAIL + message + '\n')
         self.failed_checks += 1
         self.total_checks += 1
     
+    def flush(self):
+        """输出缓存的日志"""
+        if self._buffer:
+            sys.stdout.write(''.join(self._buffer))
+            self._buffer.clear()
+    
     def header(self):
         if not self.silent_mode:
             header_text = f"""{Colors.PURPLE}
@@ -83,6 +176,119 @@ class AceFlowValidator:
         # 获取AceFlow根目录
         script_path = Path(__file__).resolve()
         self.aceflow_home = os.environ.get('ACEFLOW_HOME', str(script_path.parent.parent))
+        
+        # 已读取文件的缓存 (路径 -> 解析结果或读取时发生的异常)，各项检查共用
+        self._json_cache: Dict[Path, object] = {}
+        self._text_cache: Dict[Path, object] = {}
+        self._yaml_cache: Dict[Path, object] = {}
+        # 流程模式一致性检查的结果，检查一次后复用
+        self.detected_mode: Optional[str] = None
+    
+    @staticmethod
+    def _cached_read(cache: Dict[Path, object], path: Path, reader):
+        """按路径缓存文件读取结果; 首次读取失败时，之后的调用抛出同一异常"""
+        try:
+            result = cache[path]
+        except KeyError:
+            try:
+                result = reader(path)
+            except Exception as e:
+                result = e
+            cache[path] = result
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    @staticmethod
+    def _json_loads(data: bytes) -> Any:
+        """解析JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    @staticmethod
+    def _json_dumps(obj: Any) -> bytes:
+        """序列化为缩进格式的UTF-8 JSON字节串 (优先使用 orjson)"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    
+    def _load_json(self, path: Path):
+        """读取并解析JSON文件 (同一文件只解析一次; 调用方不应修改返回值)"""
+        return self._cached_read(self._json_cache, path,
+                                 lambda p: self._json_loads(p.read_bytes()))
+    
+    @staticmethod
+    def _validate_json_file(path: Path):
+        """仅校验JSON文件格式，不保留解析结果; 格式错误时抛出 JSONDecodeError"""
+        with open(path, 'rb') as f:
+            if orjson is not None and os.fstat(f.fileno()).st_size:
+                # 通过内存映射直接解析，不复制文件内容
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    orjson.loads(view)
+            else:
+                json.loads(f.read())
+    
+    def _read_text(self, path: Path) -> str:
+        """读取文本文件 (同一文件只读取一次)"""
+        return self._cached_read(self._text_cache, path,
+                                 lambda p: p.read_text(encoding='utf-8'))
+    
+    def _load_template(self, path: Path):
+        """解析YAML模板 (优先使用 libyaml C 加载器; 同一文件只解析一次)"""
+        import yaml  # 延迟导入，仅检查模板配置时需要
+        
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        return self._cached_read(self._yaml_cache, path,
+                                 lambda p: yaml.load(p.read_bytes(), Loader=loader))
+    
+    def _template_mode(self, path: Path) -> str:
+        """读取模板定义的流程模式 (未安装 PyYAML 时回退为查找首个 mode: 行)"""
+        try:
+            template_data = self._load_template(path) or {}
+        except ImportError:
+            content = self._read_text(path)
+            # 查找第一个以 mode: 开头 (允许缩进) 的行
+            index = content.find('mode:')
+            while index >= 0:
+                line = self._line_at(content, index)
+                if line.strip().startswith('mode:'):
+                    return line.split(':')[1].strip().strip('"\'')
+                index = content.find('mode:', index + 1)
+            return ''
+        flow_config = template_data.get('flow') or {}
+        return str(flow_config.get('mode') or template_data.get('mode') or '')
+    
+    def _template_has_quality(self, path: Path) -> bool:
+        """检查模板是否定义了质量标准 (未安装 PyYAML 时回退为文本匹配)"""
+        try:
+            template_data = self._load_template(path)
+        except ImportError:
+            return "quality" in self._read_text(path)
+        return self._has_quality_key(template_data)
+    
+    @classmethod
+    def _has_quality_key(cls, node) -> bool:
+        """递归检查配置中是否存在质量相关的键 (如 quality_gates、quality_standards)"""
+        if isinstance(node, dict):
+            return any(('quality' in str(key)) or cls._has_quality_key(value)
+                       for key, value in node.items())
+        if isinstance(node, list):
+            return any(cls._has_quality_key(item) for item in node)
+        return False
+    
+    def _clear_file_cache(self):
+        """文件被修改后清空读取缓存"""
+        self._json_cache.clear()
+        self._text_cache.clear()
+        self._yaml_cache.clear()
+    
+    @staticmethod
+    def _line_at(content: str, index: int) -> str:
+        """返回文本中 index 位置所在的整行 (不含换行符)"""
+        start = content.rfind('\n', 0, index) + 1
+        end = content.find('\n', index)
+        return content[start:end] if end >= 0 else content[start:]
     
     def check_basic_structure(self) -> bool:
         """检查项目基础结构"""
@@ -91,28 +297,30 @@ class AceFlowValidator:
         structure_ok = True
         
         # 检查.clinerules文件
+        # (直接读取文件，以 FileNotFoundError 判断文件不存在，省去单独的 exists() 检查)
         clinerules_path = self.project_dir / ".clinerules"
-        if clinerules_path.exists():
+        try:
+            content = self._read_text(clinerules_path)
+        except FileNotFoundError:
+            self.logger.error("AI Agent配置文件 (.clinerules) 不存在")
+            structure_ok = False
+        except Exception as e:
+            self.logger.success("AI Agent配置文件 (.clinerules) 存在")
+            self.logger.error(f".clinerules 文件读取失败: {e}")
+            structure_ok = False
+        else:
             self.logger.success("AI Agent配置文件 (.clinerules) 存在")
             
             # 检查内容完整性
-            try:
-                content = clinerules_path.read_text(encoding='utf-8')
-                if "AceFlow" in content and "aceflow_result" in content:
-                    self.logger.success(".clinerules 包含必要的AceFlow配置")
-                else:
-                    self.logger.error(".clinerules 缺少必要的AceFlow配置")
-                    structure_ok = False
-            except Exception as e:
-                self.logger.error(f".clinerules 文件读取失败: {e}")
+            if "AceFlow" in content and "aceflow_result" in content:
+                self.logger.success(".clinerules 包含必要的AceFlow配置")
+            else:
+                self.logger.error(".clinerules 缺少必要的AceFlow配置")
                 structure_ok = False
-        else:
-            self.logger.error("AI Agent配置文件 (.clinerules) 不存在")
-            structure_ok = False
         
-        # 检查aceflow_result目录
+        # 检查aceflow_result目录 (is_dir() 一次 stat 即可同时判断存在性)
         aceflow_result_path = self.project_dir / "aceflow_result"
-        if aceflow_result_path.exists() and aceflow_result_path.is_dir():
+        if aceflow_result_path.is_dir():
             self.logger.success("项目输出目录 (aceflow_result/) 存在")
         else:
             self.logger.error("项目输出目录 (aceflow_result/) 不存在")
@@ -120,7 +328,7 @@ class AceFlowValidator:
         
         # 检查.aceflow配置目录
         aceflow_config_path = self.project_dir / ".aceflow"
-        if aceflow_config_path.exists() and aceflow_config_path.is_dir():
+        if aceflow_config_path.is_dir():
             self.logger.success("配置目录 (.aceflow/) 存在")
             
             # 检查模板文件
@@ -145,13 +353,11 @@ class AceFlowValidator:
             
             # 验证JSON格式
             try:
-                with open(state_file_path, 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
+                state_data = self._load_json(state_file_path)
                 self.logger.success("项目状态文件格式正确")
                 
                 # 检查必要字段
-                required_fields = ["project", "flow", "memory", "quality"]
-                for field in required_fields:
+                for field in REQUIRED_STATE_FIELDS:
                     if field in state_data:
                         self.logger.success(f"状态文件包含字段: {field}")
                     else:
@@ -169,8 +375,7 @@ class AceFlowValidator:
             self.logger.success("阶段进度文件存在")
             
             try:
-                with open(progress_file_path, 'r', encoding='utf-8') as f:
-                    json.load(f)
+                self._validate_json_file(progress_file_path)
                 self.logger.success("阶段进度文件格式正确")
             except json.JSONDecodeError:
                 self.logger.error("阶段进度文件JSON格式错误")
@@ -179,8 +384,16 @@ class AceFlowValidator:
         else:
             self.logger.warning("阶段进度文件不存在")
     
-    def check_mode_consistency(self) -> str:
-        """检查流程模式一致性"""
+    def check_mode_consistency(self, force: bool = False) -> str:
+        """检查流程模式一致性 (结果缓存于 detected_mode，force 为 True 时重新检查)"""
+        if self.detected_mode is not None and not force:
+            return self.detected_mode
+        
+        self.detected_mode = self._detect_mode()
+        return self.detected_mode
+    
+    def _detect_mode(self) -> str:
+        """读取状态文件、.clinerules 及模板中的模式并比较"""
         self.logger.info("检查流程模式一致性...")
         
         mode_from_state = ""
@@ -191,8 +404,7 @@ class AceFlowValidator:
         state_file_path = self.project_dir / "aceflow_result" / "current_state.json"
         if state_file_path.exists():
             try:
-                with open(state_file_path, 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
+                state_data = self._load_json(state_file_path)
                 mode_from_state = state_data.get('project', {}).get('mode', '')
             except Exception:
                 pass
@@ -201,11 +413,11 @@ class AceFlowValidator:
         clinerules_path = self.project_dir / ".clinerules"
         if clinerules_path.exists():
             try:
-                content = clinerules_path.read_text(encoding='utf-8')
-                for line in content.split('\n'):
-                    if "AceFlow模式:" in line:
-                        mode_from_clinerules = line.split(':')[1].strip()
-                        break
+                content = self._read_text(clinerules_path)
+                # 直接定位标记所在的行，无需将全文拆分为行列表
+                index = content.find("AceFlow模式:")
+                if index >= 0:
+                    mode_from_clinerules = self._line_at(content, index).split(':')[1].strip()
             except Exception:
                 pass
         
@@ -213,11 +425,7 @@ class AceFlowValidator:
         template_path = self.project_dir / ".aceflow" / "template.yaml"
         if template_path.exists():
             try:
-                content = template_path.read_text(encoding='utf-8')
-                for line in content.split('\n'):
-                    if line.strip().startswith('mode:'):
-                        mode_from_template = line.split(':')[1].strip().strip('"\'')
-                        break
+                mode_from_template = self._template_mode(template_path)
             except Exception:
                 pass
         
@@ -243,23 +451,16 @@ class AceFlowValidator:
             return
         
         # 检查基础文件结构
-        expected_files = []
-        if mode == "minimal":
-            expected_files = ["current_state.json", "stage_progress.json"]
-        elif mode == "standard":
-            expected_files = ["current_state.json", "stage_progress.json", "user_stories.md", "tasks_planning.md"]
-        elif mode == "complete":
-            expected_files = ["current_state.json", "stage_progress.json", "s1_user_story.md", "s2_tasks_group.md"]
-        elif mode == "smart":
-            expected_files = ["current_state.json", "stage_progress.json", "project_analysis.json"]
-        else:
+        expected_files = EXPECTED_FILES_BY_MODE.get(mode)
+        if expected_files is None:
             self.logger.warning("未知模式，跳过特定文件检查")
             return
         
-        # 检查预期文件
+        # 检查预期文件 (读取一次目录内容，代替逐个文件的 exists() 调用)
+        with os.scandir(aceflow_result_path) as it:
+            present = {entry.name for entry in it}
         for filename in expected_files:
-            file_path = aceflow_result_path / filename
-            if file_path.exists():
+            if filename in present:
                 self.logger.success(f"预期文件存在: {filename}")
             else:
                 self.logger.warning(f"预期文件不存在: {filename}")
@@ -267,12 +468,18 @@ class AceFlowValidator:
         # 检查文件命名规范
         non_compliant_files = []
         try:
-            for file_path in aceflow_result_path.rglob('*'):
-                if file_path.is_file():
-                    basename = file_path.name
-                    # AceFlow命名规范: 只允许字母、数字、下划线、连字符和点
-                    if not re.match(r'^[a-zA-Z0-9_.-]+$', basename):
-                        non_compliant_files.append(basename)
+            # 使用 os.scandir 按栈遍历目录树，文件类型直接取自目录项
+            pending_dirs = [str(aceflow_result_path)]
+            while pending_dirs:
+                with os.scandir(pending_dirs.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending_dirs.append(entry.path)
+                        elif entry.is_file():
+                            basename = entry.name
+                            # 删除所有允许的字符后仍有剩余，即不符合命名规范
+                            if os.fsencode(basename).translate(None, _VALID_NAME_BYTES):
+                                non_compliant_files.append(basename)
         except Exception as e:
             self.logger.warning(f"文件命名检查失败: {e}")
         
@@ -291,8 +498,7 @@ class AceFlowValidator:
             self.logger.success("记忆状态文件存在")
             
             try:
-                with open(memory_state_path, 'r', encoding='utf-8') as f:
-                    json.load(f)
+                self._validate_json_file(memory_state_path)
                 self.logger.success("记忆状态文件格式正确")
             except json.JSONDecodeError:
                 self.logger.error("记忆状态文件JSON格式错误")
@@ -305,8 +511,7 @@ class AceFlowValidator:
         state_file_path = self.project_dir / "aceflow_result" / "current_state.json"
         if state_file_path.exists():
             try:
-                with open(state_file_path, 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
+                state_data = self._load_json(state_file_path)
                 memory_enabled = state_data.get('memory', {}).get('enabled', False)
                 
                 if memory_enabled:
@@ -331,8 +536,7 @@ class AceFlowValidator:
         template_path = self.project_dir / ".aceflow" / "template.yaml"
         if template_path.exists():
             try:
-                content = template_path.read_text(encoding='utf-8')
-                if "quality" in content:
+                if self._template_has_quality(template_path):
                     self.logger.success("模板定义了质量标准")
                 else:
                     self.logger.warning("模板未定义质量标准")
@@ -352,8 +556,7 @@ class AceFlowValidator:
             analysis_path = self.project_dir / "aceflow_result" / "project_analysis.json"
             if analysis_path.exists():
                 try:
-                    with open(analysis_path, 'r', encoding='utf-8') as f:
-                        analysis_data = json.load(f)
+                    analysis_data = self._load_json(analysis_path)
                     if 'quality' in str(analysis_data):
                         self.logger.success("Smart模式包含质量指标跟踪")
                     else:
@@ -361,6 +564,35 @@ class AceFlowValidator:
                 except Exception:
                     self.logger.warning("Smart模式质量指标检查失败")
     
+    def _count_git_changes(self) -> Optional[int]:
+        """统计工作区中有改动的文件数; 优先使用 pygit2 读取索引，缺失时回退到 git 命令"""
+        try:
+            import pygit2
+        except ImportError:
+            pygit2 = None
+        
+        if pygit2 is not None:
+            repo = pygit2.Repository(str(self.project_dir))
+            try:
+                # 与 git status --porcelain 一致: 未跟踪目录只计为一项
+                status = repo.status(untracked_files="normal")
+            except TypeError:
+                # pygit2 < 1.14 不支持该参数，回退到 git 命令
+                status = None
+            if status is not None:
+                return sum(1 for flags in status.values()
+                           if not flags & pygit2.GIT_STATUS_IGNORED)
+        
+        result = subprocess.run(
+            ["git", "status", "--porcelain"],
+            cwd=self.project_dir,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return None
+        return len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
+    
     def generate_report(self, detected_mode: str) -> str:
         """生成验证报告"""
         self.logger.info("生成验证报告...")
@@ -373,14 +605,8 @@ class AceFlowValidator:
         git_status = "unknown"
         try:
             if (self.project_dir / ".git").exists():
-                result = subprocess.run(
-                    ["git", "status", "--porcelain"],
-                    cwd=self.project_dir,
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    changed_files = len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
+                changed_files = self._count_git_changes()
+                if changed_files is not None:
                     git_status = f"{changed_files} files changed"
         except Exception:
             pass
@@ -423,7 +649,7 @@ class AceFlowValidator:
                 "aceflow_home": self.aceflow_home,
                 "python_version": python_version,
                 "git_status": git_status,
-                "working_directory": str(Path.cwd())
+                "working_directory": str(self.project_dir)
             },
             "recommendations": recommendations
         }
@@ -433,8 +659,7 @@ class AceFlowValidator:
         
         # 写入报告文件
         try:
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            report_path.write_bytes(self._json_dumps(report_data))
             self.logger.success(f"验证报告已生成: {report_path}")
             return str(report_path)
         except Exception as e:
@@ -464,34 +689,12 @@ class AceFlowValidator:
         state_file_path = aceflow_result_path / "current_state.json"
         if not state_file_path.exists():
             current_time = datetime.now().isoformat()
-            default_state = {
-                "project": {
-                    "name": "修复的项目",
-                    "mode": "standard",
-                    "created_at": current_time,
-                    "last_updated": current_time,
-                    "version": "3.0.0"
-                },
-                "flow": {
-                    "current_stage": "initialized",
-                    "completed_stages": [],
-                    "progress_percentage": 0
-                },
-                "memory": {
-                    "enabled": True,
-                    "last_session": current_time,
-                    "context_preserved": False
-                },
-                "quality": {
-                    "standards_applied": False,
-                    "compliance_checked": True,
-                    "last_validation": current_time
-                }
-            }
+            default_state = copy.deepcopy(DEFAULT_STATE)
+            for section, key in DEFAULT_STATE_TIMESTAMPS:
+                default_state[section][key] = current_time
             
             try:
-                with open(state_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(default_state, f, indent=2, ensure_ascii=False)
+                state_file_path.write_bytes(self._json_dumps(default_state))
                 self.logger.success("已创建基础项目状态文件")
                 fixed_count += 1
             except Exception as e:
@@ -500,36 +703,17 @@ class AceFlowValidator:
         # 修复缺失的.clinerules文件
         clinerules_path = self.project_dir / ".clinerules"
         if not clinerules_path.exists():
-            default_clinerules = """# AceFlow v3.0 - AI Agent 集成配置
-# 自动修复生成
-
-## 工作模式配置
-AceFlow模式: standard
-输出目录: aceflow_result/
-配置目录: .aceflow/
-
-## 核心工作原则  
-1. 所有项目文档和代码必须输出到 aceflow_result/ 目录
-2. 严格按照 .aceflow/template.yaml 中定义的流程执行
-3. 每个阶段完成后更新项目状态文件
-4. 保持跨对话的工作记忆和上下文连续性
-
-## 质量标准
-- 代码质量: 遵循项目编码规范，注释完整
-- 文档质量: 结构清晰，内容完整，格式统一
-- 测试覆盖: 根据模式要求执行相应测试策略
-- 交付标准: 符合 aceflow-spec_v3.0.md 规范
-
-记住: AceFlow是AI Agent的增强层，通过规范化输出和状态管理，实现跨对话的工作连续性。
-"""
-            
             try:
-                clinerules_path.write_text(default_clinerules, encoding='utf-8')
+                clinerules_path.write_text(DEFAULT_CLINERULES, encoding='utf-8')
                 self.logger.success("已创建基础 .clinerules 配置文件")
                 fixed_count += 1
             except Exception as e:
                 self.logger.error(f"创建 .clinerules 文件失败: {e}")
         
+        # 修复过程中可能写入了新文件，之后的检查需重新读取
+        self._clear_file_cache()
+        self.detected_mode = None
+        
         if fixed_count > 0:
             self.logger.success(f"自动修复完成，共修复 {fixed_count} 个问题")
         else:
@@ -540,41 +724,45 @@ AceFlow模式: standard
         if self.logger.silent_mode:
             return
         
-        print()
-        print(f"{Colors.PURPLE}╔══════════════════════════════════════╗")
-        print("║           验证结果摘要               ║")
-        print(f"╚══════════════════════════════════════╝{Colors.NC}")
-        print()
-        
-        # 结果统计
-        print(f"{Colors.CYAN}检查统计:{Colors.NC}")
-        print(f"  总检查项: {self.logger.total_checks}")
-        print(f"  通过: {Colors.GREEN}{self.logger.passed_checks}{Colors.NC}")
-        print(f"  失败: {Colors.RED}{self.logger.failed_checks}{Colors.NC}")
-        print(f"  警告: {Colors.YELLOW}{self.logger.warning_checks}{Colors.NC}")
+        logger = self.logger
         
         # 成功率计算
         success_rate = 0.0
-        if self.logger.total_checks > 0:
-            success_rate = round((self.logger.passed_checks * 100) / self.logger.total_checks, 1)
-        print(f"  成功率: {Colors.BLUE}{success_rate}%{Colors.NC}")
-        print()
+        if logger.total_checks > 0:
+            success_rate = round((logger.passed_checks * 100) / logger.total_checks, 1)
         
         # 总体评估
-        if self.logger.failed_checks == 0:
-            if self.logger.warning_checks == 0:
-                print(f"{Colors.GREEN}✅ 项目验证完全通过！{Colors.NC}")
-                print("您可以安全地使用AceFlow的所有功能。")
+        if logger.failed_checks == 0:
+            if logger.warning_checks == 0:
+                verdict = (f"{Colors.GREEN}✅ 项目验证完全通过！{Colors.NC}",
+                           "您可以安全地使用AceFlow的所有功能。")
             else:
-                print(f"{Colors.YELLOW}⚠️  项目验证基本通过，但有警告项{Colors.NC}")
-                print("建议查看警告信息并考虑改进。")
+                verdict = (f"{Colors.YELLOW}⚠️  项目验证基本通过，但有警告项{Colors.NC}",
+                           "建议查看警告信息并考虑改进。")
         else:
-            print(f"{Colors.RED}❌ 项目验证失败{Colors.NC}")
-            print("请修复失败的检查项后重新验证。")
-        
-        print()
-        print(f"{Colors.CYAN}模式信息:{Colors.NC} {detected_mode}")
-        print(f"{Colors.CYAN}项目目录:{Colors.NC} {self.project_dir}")
+            verdict = (f"{Colors.RED}❌ 项目验证失败{Colors.NC}",
+                       "请修复失败的检查项后重新验证。")
+        
+        # 摘要整体拼接后一次性输出
+        lines = [
+            "",
+            f"{Colors.PURPLE}╔══════════════════════════════════════╗",
+            "║           验证结果摘要               ║",
+            f"╚══════════════════════════════════════╝{Colors.NC}",
+            "",
+            f"{Colors.CYAN}检查统计:{Colors.NC}",
+            f"  总检查项: {logger.total_checks}",
+            f"  通过: {Colors.GREEN}{logger.passed_checks}{Colors.NC}",
+            f"  失败: {Colors.RED}{logger.failed_checks}{Colors.NC}",
+            f"  警告: {Colors.YELLOW}{logger.warning_checks}{Colors.NC}",
+            f"  成功率: {Colors.BLUE}{success_rate}%{Colors.NC}",
+            "",
+            *verdict,
+            "",
+            f"{Colors.CYAN}模式信息:{Colors.NC} {detected_mode}",
+            f"{Colors.CYAN}项目目录:{Colors.NC} {self.project_dir}",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def validate(self) -> bool:
         """执行完整验证流程"""
@@ -585,33 +773,42 @@ AceFlow模式: standard
             print(f"{Colors.CYAN}检查模式:{Colors.NC} {self.check_mode}")
             print()
         
-        # 执行基础检查
-        self.check_basic_structure()
-        
-        # 根据检查模式执行相应的验证
-        detected_mode = "unknown"
-        
-        if self.check_mode == "quick":
-            # 快速检查只验证基础结构
-            pass
-        elif self.check_mode in ["standard", "complete"]:
-            self.check_state_files()
-            detected_mode = self.check_mode_consistency()
+        try:
+            # 执行基础检查
+            self.check_basic_structure()
+            self.logger.flush()
             
-            if detected_mode not in ["unknown", "inconsistent"]:
-                self.check_output_compliance(detected_mode)
-                self.check_quality_standards(detected_mode)
+            # 根据检查模式执行相应的验证
+            detected_mode = "unknown"
             
-            if self.check_mode == "complete":
-                self.check_memory_system()
-        
-        # 自动修复
-        if self.auto_fix and self.logger.failed_checks > 0:
-            self.auto_fix_issues()
+            if self.check_mode == "quick":
+                # 快速检查只验证基础结构
+                pass
+            elif self.check_mode in ["standard", "complete"]:
+                self.check_state_files()
+                detected_mode = self.check_mode_consistency()
+                self.logger.flush()
+                
+                if detected_mode not in ["unknown", "inconsistent"]:
+                    self.check_output_compliance(detected_mode)
+                    self.check_quality_standards(detected_mode)
+                    self.logger.flush()
+                
+                if self.check_mode == "complete":
+                    self.check_memory_system()
+                    self.logger.flush()
+            
+            # 自动修复 (会清除缓存的模式检查结果，修复后重新检查)
+            if self.auto_fix and self.logger.failed_checks > 0:
+                self.auto_fix_issues()
+                detected_mode = self.check_mode_consistency()
+            
+            if detected_mode == "unknown":
+                detected_mode = self.check_mode_consistency()
+        finally:
+            self.logger.flush()
         
         # 显示摘要
-        if detected_mode == "unknown":
-            detected_mode = self.check_mode_consistency()
         self.show_summary(detected_mode)
         
         # 返回验证结果
@@ -673,7 +870,7 @@ def main():
     # 验证项目目录
     project_dir = Path(args.directory).resolve()
     if not project_dir.exists():
-        print(f"{Colors.RED}[ERROR]{Colors.NC} 项目目录不存在: {project_dir}")
+        print(f"{ValidationLogger._ERROR}项目目录不存在: {project_dir}")
         sys.exit(1)
     
     # 创建验证器并执行验证
@@ -685,29 +882,24 @@ def main():
     )
     
     try:
-        # 切换到项目目录
-        original_cwd = Path.cwd()
-        os.chdir(project_dir)
-        
         # 执行验证
         validation_passed = validator.validate()
         
         # 生成报告
         if args.report:
-            detected_mode = validator.check_mode_consistency()
-            validator.generate_report(detected_mode)
-        
-        # 恢复原始工作目录
-        os.chdir(original_cwd)
+            validator.generate_report(validator.check_mode_consistency())
+            validator.logger.flush()
         
         # 设置退出码
         sys.exit(0 if validation_passed else 1)
         
     except KeyboardInterrupt:
-        print(f"\n{Colors.YELLOW}[WARN]{Colors.NC} 验证被用户中断")
+        validator.logger.flush()
+        print(f"\n{ValidationLogger._WARN}验证被用户中断")
         sys.exit(130)
     except Exception as e:
-        print(f"{Colors.RED}[ERROR]{Colors.NC} 验证过程中发生错误: {e}")
+        validator.logger.flush()
+        print(f"{ValidationLogger._ERROR}验证过程中发生错误: {e}")
         sys.exit(1)
 
 
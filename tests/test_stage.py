@@ -0,0 +1,49 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = REPO_ROOT / "aceflow" / "scripts" / "aceflow-stage.py"
+
+
+def load_stage_module():
+    # 脚本文件名包含连字符，按路径加载
+    spec = importlib.util.spec_from_file_location("aceflow_stage", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("argv", [
+    [],
+    ["status"],
+    ["next", "-v"],
+    ["goto", "S3", "-f"],
+    ["reset", "S1", "--force", "--verbose"],
+    ["-d", "proj", "status"],
+    ["complete", "S2", "--directory", "proj"],
+    ["--directory=proj", "list"],
+    ["--directory=", "status"],
+    ["-v", "goto", "S4", "-d", "a b"],
+])
+def test_fast_parser_matches_argparse(argv):
+    # 快速解析能处理的参数，结果应与 argparse 完全一致
+    stage = load_stage_module().AceFlowStage
+    fast = stage._parse_argv(argv)
+    assert fast is not None
+    assert vars(fast) == vars(stage._parse_argv_full(argv))
+
+
+@pytest.mark.parametrize("argv", [
+    ["-h"],
+    ["--version"],
+    ["-fv", "status"],
+    ["status", "-d"],
+    ["status", "--unknown"],
+    ["goto", "S1", "extra"],
+])
+def test_fast_parser_defers_to_argparse(argv):
+    # 帮助、版本、组合短参数及错误参数交由 argparse 处理
+    stage = load_stage_module().AceFlowStage
+    assert stage._parse_argv(argv) is None
@@ -0,0 +1,113 @@
+import importlib.util
+import json
+import shutil
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = REPO_ROOT / "aceflow" / "scripts" / "aceflow-templates.py"
+TEMPLATES = REPO_ROOT / "aceflow" / "templates"
+
+
+def load_templates_module():
+    # 脚本文件名包含连字符，按路径加载
+    spec = importlib.util.spec_from_file_location("aceflow_templates", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_project(project_dir: Path, mode: str = "minimal"):
+    # 已初始化的项目: 配置目录、状态文件及 .clinerules
+    (project_dir / "aceflow_result").mkdir()
+    shutil.copytree(TEMPLATES / mode, project_dir / ".aceflow")
+    state = {"project": {"mode": mode}, "flow": {}}
+    (project_dir / "aceflow_result" / "current_state.json").write_text(json.dumps(state), encoding="utf-8")
+    (project_dir / ".clinerules").write_text(f"AceFlow模式: {mode}\n", encoding="utf-8")
+
+
+def list_backup_files(project_dir: Path):
+    return sorted((project_dir / "aceflow_result" / "backups").glob("config_backup_*.tar.gz"))
+
+
+def test_backup_restore_follows_symlinks(tmp_path):
+    # 配置目录中的符号链接按目标内容备份，恢复后为普通文件
+    module = load_templates_module()
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    make_project(project_dir)
+    outside = tmp_path / "shared_template.yaml"
+    outside.write_text("project:\n  description: shared\n", encoding="utf-8")
+    template_file = project_dir / ".aceflow" / "template.yaml"
+    template_file.unlink()
+    template_file.symlink_to(outside)
+
+    manager = module.AceFlowTemplateManager(str(project_dir))
+    assert manager.backup_current_config()
+    backup_name = list_backup_files(project_dir)[0].name
+
+    shutil.rmtree(project_dir / ".aceflow")
+    assert manager.restore_from_backup(backup_name, force=True)
+    assert not template_file.is_symlink()
+    assert template_file.read_text(encoding="utf-8") == outside.read_text(encoding="utf-8")
+
+
+def test_backup_skipped_until_config_changes(tmp_path, monkeypatch):
+    # 配置未变化时跳过备份，配置改动后重新备份
+    module = load_templates_module()
+    make_project(tmp_path)
+    # 备份名称精确到秒，使每次调用得到不同的时间戳
+    timestamps = iter(range(10))
+
+    class FakeDatetime(module.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return module.datetime(2024, 1, 1, 0, 0, next(timestamps), tzinfo=tz)
+
+    monkeypatch.setattr(module, "datetime", FakeDatetime)
+    manager = module.AceFlowTemplateManager(str(tmp_path))
+
+    assert manager.backup_current_config()
+    assert len(list_backup_files(tmp_path)) == 1
+
+    assert manager.backup_current_config()
+    assert len(list_backup_files(tmp_path)) == 1
+
+    (tmp_path / ".clinerules").write_text("AceFlow模式: minimal\n# changed\n", encoding="utf-8")
+    assert manager.backup_current_config()
+    assert len(list_backup_files(tmp_path)) == 2
+
+
+def test_switch_mode_recovers_interrupted_switch(tmp_path):
+    # 上次切换在 .aceflow 重命名为 .aceflow.old 之后中断: 先恢复原配置并备份，再完成切换
+    import tarfile
+
+    module = load_templates_module()
+    make_project(tmp_path)
+    original_template = (tmp_path / ".aceflow" / "template.yaml").read_bytes()
+    (tmp_path / ".aceflow").rename(tmp_path / ".aceflow.old")
+    (tmp_path / ".aceflow.new").mkdir()
+    (tmp_path / ".aceflow.new" / "partial.yaml").write_text("partial", encoding="utf-8")
+
+    manager = module.AceFlowTemplateManager(str(tmp_path))
+    assert manager.switch_mode("standard", force=True)
+
+    assert not (tmp_path / ".aceflow.old").exists()
+    assert not (tmp_path / ".aceflow.new").exists()
+    assert (tmp_path / ".aceflow" / "template.yaml").read_bytes() == \
+        (TEMPLATES / "standard" / "template.yaml").read_bytes()
+    assert manager.get_current_mode() == "standard"
+
+    # 恢复出的原配置已进入切换前的备份
+    backups = list_backup_files(tmp_path)
+    assert len(backups) == 1
+    with tarfile.open(backups[0], "r:gz") as tar:
+        assert tar.extractfile(".aceflow/template.yaml").read() == original_template
+
+
+def test_template_details_empty_template(tmp_path):
+    # 空的 template.yaml 显示为无描述，而不是读取失败
+    module = load_templates_module()
+    (tmp_path / "template.yaml").write_text("", encoding="utf-8")
+
+    manager = module.AceFlowTemplateManager(str(tmp_path))
+    assert "    📝 描述: 无描述" in manager._template_details(tmp_path)
@@ -0,0 +1,58 @@
+import importlib.util
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = REPO_ROOT / "aceflow" / "scripts" / "aceflow-validate.py"
+TEMPLATES = REPO_ROOT / "aceflow" / "templates"
+
+
+def load_validate_module():
+    # 脚本文件名包含连字符，按路径加载
+    spec = importlib.util.spec_from_file_location("aceflow_validate", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_minimal_project(project_dir: Path):
+    # 模式一致的 minimal 项目，状态文件缺少 quality 字段 (一项检查失败)
+    (project_dir / ".aceflow").mkdir()
+    (project_dir / "aceflow_result").mkdir()
+    shutil.copy(TEMPLATES / "minimal" / "template.yaml", project_dir / ".aceflow" / "template.yaml")
+    state = {"project": {"mode": "minimal"}, "flow": {}, "memory": {"enabled": True}}
+    (project_dir / "aceflow_result" / "current_state.json").write_text(json.dumps(state), encoding="utf-8")
+    (project_dir / ".clinerules").write_text(
+        "# AceFlow\nAceFlow模式: minimal\n输出目录: aceflow_result/\n", encoding="utf-8"
+    )
+
+
+def test_fix_report_keeps_detected_mode(tmp_path, monkeypatch):
+    # --fix --report: 自动修复后报告中的模式应与摘要一致，而不是 null
+    module = load_validate_module()
+    make_minimal_project(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["aceflow-validate.py", "-d", str(tmp_path), "--fix", "--report", "-s"])
+
+    with pytest.raises(SystemExit) as exc_info:
+        module.main()
+    assert exc_info.value.code == 1
+
+    reports = list((tmp_path / "aceflow_result").glob("validation_report_*.json"))
+    assert len(reports) == 1
+    report = json.loads(reports[0].read_text(encoding="utf-8"))
+    assert report["validation"]["detected_mode"] == "minimal"
+    assert report["results"]["failed_checks"] == 1
+
+
+def test_mode_detected_without_pyyaml(tmp_path, monkeypatch):
+    # 未安装 PyYAML 时回退为文本扫描，仍能确定模板模式并执行后续检查
+    module = load_validate_module()
+    make_minimal_project(tmp_path)
+    monkeypatch.setitem(sys.modules, "yaml", None)
+
+    validator = module.AceFlowValidator(str(tmp_path))
+    assert validator.check_mode_consistency() == "minimal"